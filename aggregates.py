@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import directus
+
+# Consultas de agregação do Trading History, resolvidas no Directus (aggregate/groupBy).
+# Cada uma devolve poucas linhas, em vez do histórico inteiro da conta.
+TRADING_QUERIES = {
+    "total": ([], {"count": "*"}),
+    "asset": (["Asset"], {"count": "*", "sum": "Lots"}),
+    "side": (["Side"], {"count": "*"}),
+    "asset_side": (["Asset", "Side"], {"count": "*"}),
+    "type_side": (["Type", "Side"], {"count": "*", "sum": "Openprice,Closeprice"}),
+    "hour_side": (["hour(Opentime)", "Side"], {"count": "*", "sum": "Openprice,Closeprice"}),
+    "status": (["Account_status"], {"count": "*"}),
+}
+
+
+def aggregate(url: str, bearer: str, account: str, group_by: list, aggregates: dict,
+              timeout=directus.DEFAULT_TIMEOUT, periodo=None) -> pd.DataFrame:
+    """Executa uma agregação no Directus e devolve um frame plano.
+
+    `aggregates` mapeia função -> campos (ex.: {"sum": "Lots"}); colunas do
+    resultado seguem `count` e `<func>_<campo>` (ex.: `sum_Lots`).
+    """
+    params = {**directus.build_params(url, account, periodo=periodo)}
+    for func, campos in aggregates.items():
+        params[f"aggregate[{func}]"] = campos
+    if group_by:
+        params["groupBy"] = ",".join(group_by)
+    data = directus.get_json(url, bearer, params, timeout).get("data", [])
+
+    linhas = []
+    for item in data:
+        linha = {}
+        for key, value in item.items():
+            if isinstance(value, dict):
+                # {"sum": {"Lots": 1.5}} -> sum_Lots
+                for campo, v in value.items():
+                    linha[f"{key}_{campo}"] = v
+            else:
+                linha[key] = value
+        linhas.append(linha)
+    df = pd.DataFrame(linhas)
+
+    # Funções de data voltam como `<campo>_<func>` (ex.: Opentime_hour)
+    for campo in group_by:
+        if "(" in campo:
+            func, nome = campo.rstrip(")").split("(")
+            for alias in (f"{nome}_{func}", campo):
+                if alias in df.columns:
+                    df = df.rename(columns={alias: func})
+                    break
+    for col in df.columns:
+        if col not in group_by:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def _pnl_medio(df: pd.DataFrame, chave: str) -> pd.DataFrame:
+    # Média de PnL_points por `chave` a partir das somas por Side:
+    # BUY soma (close - open), SELL soma (open - close), outros contam 0.
+    if df.empty:
+        return pd.DataFrame()
+    diff = df["sum_Closeprice"].fillna(0) - df["sum_Openprice"].fillna(0)
+    df = df.assign(pnl=np.select([df["Side"] == "BUY", df["Side"] == "SELL"], [diff, -diff], default=0.0))
+    por_chave = df.groupby(chave, as_index=False)[["count", "pnl"]].sum()
+    por_chave["PnL_points"] = por_chave["pnl"] / por_chave["count"]
+    return por_chave.drop(columns="pnl")
+
+
+def trading_summary(url: str, bearer: str, account: str, timeout=directus.DEFAULT_TIMEOUT,
+                    periodo=None) -> analytics.TradingSummary:
+    """Resumo do Trading History calculado no servidor.
+
+    Mesmo formato de analytics.compute_trading_summary, sem histogramas
+    (que exigiriam as linhas).
+    """
+    with ThreadPoolExecutor(max_workers=len(TRADING_QUERIES)) as pool:
+        futures = {
+            nome: pool.submit(aggregate, url, bearer, account, group_by, aggs, timeout, periodo)
+            for nome, (group_by, aggs) in TRADING_QUERIES.items()
+        }
+        res = {nome: future.result() for nome, future in futures.items()}
+
+    total = res["total"]
+    asset = res["asset"].rename(columns={"sum_Lots": "Lots"})
+    return analytics.TradingSummary(
+        total=int(total["count"].iloc[0]) if not total.empty else 0,
+        asset=asset.sort_values("count", ascending=False, ignore_index=True) if not asset.empty else asset,
+        side=res["side"],
+        asset_side=res["asset_side"],
+        type=_pnl_medio(res["type_side"], "Type"),
+        hour=_pnl_medio(res["hour_side"], "hour"),
+        status=res["status"],
+    )
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+import cache
+import directus
+
+# Dimensões do cubo do Trading History e colunas com histograma (nº de bins)
+DIMENSIONS = ("Asset", "Side", "Type", "hour", "Account_status")
+HISTOGRAMS = {"Openprice": 50, "Closeprice": 50, "Duration": 20, "Lots": 50, "Ticks": 20}
+
+
+@dataclass
+class TradingSummary:
+    """Tudo que os gráficos agregados do Trading History precisam.
+
+    Frames com coluna `count`; `asset` tem `Lots`, `type`/`hour` têm `PnL_points`
+    (média). Um frame vazio significa que a coluna não existe na coleção.
+    `histograms` mapeia coluna -> (contagens, bordas).
+    """
+    total: int
+    asset: pd.DataFrame
+    side: pd.DataFrame
+    asset_side: pd.DataFrame
+    type: pd.DataFrame
+    hour: pd.DataFrame
+    status: pd.DataFrame
+    histograms: dict = field(default_factory=dict)
+
+
+def fingerprint(df: pd.DataFrame) -> tuple:
+    # Barato: tamanho, colunas, data mais recente e hash dos ids
+    partes = [len(df), tuple(df.columns)]
+    for col in ("date_updated", "date_created"):
+        if col in df.columns:
+            partes.append(str(df[col].max()))
+    if "id" in df.columns:
+        partes.append(int(pd.util.hash_pandas_object(df["id"], index=False).sum()))
+    return tuple(partes)
+
+
+def _marginal(cube: pd.DataFrame, keys: list, valores: list) -> pd.DataFrame:
+    if not all(k in cube.columns for k in keys):
+        return pd.DataFrame()
+    out = cube.groupby(keys, observed=True, as_index=False)[["count"] + valores].sum()
+    if "pnl_sum" in valores:
+        out["PnL_points"] = out["pnl_sum"] / out["pnl_n"].replace(0, np.nan)
+        out = out.drop(columns=["pnl_sum", "pnl_n"])
+    return out
+
+
+def compute_trading_summary(df: pd.DataFrame) -> TradingSummary:
+    """Uma única passada pelas linhas: agrupa por todas as dimensões de uma vez
+    (cubo pequeno) e deriva cada gráfico do cubo; depois, um histograma por coluna."""
+    dims = [c for c in DIMENSIONS if c in df.columns]
+    tem_lots = "Lots" in df.columns
+    tem_pnl = "PnL_points" in df.columns
+
+    if dims:
+        aggs = {"count": (dims[0], "size")}
+        if tem_lots:
+            aggs["Lots"] = ("Lots", "sum")
+        if tem_pnl:
+            aggs["pnl_sum"] = ("PnL_points", "sum")
+            aggs["pnl_n"] = ("PnL_points", "count")
+        cube = df.groupby(dims, observed=True, dropna=False).agg(**aggs).reset_index()
+    else:
+        cube = pd.DataFrame()
+
+    pnl = ["pnl_sum", "pnl_n"] if tem_pnl else []
+    asset = _marginal(cube, ["Asset"], ["Lots"] if tem_lots else [])
+    if not asset.empty:
+        asset = asset.sort_values("count", ascending=False, ignore_index=True)
+    side = _marginal(cube, ["Side"], [])
+    if not side.empty:
+        side = side.sort_values("count", ascending=False, ignore_index=True)
+
+    histograms = {}
+    for col, bins in HISTOGRAMS.items():
+        if col in df.columns:
+            valores = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            valores = valores[np.isfinite(valores)]
+            if len(valores):
+                histograms[col] = np.histogram(valores, bins=bins)
+
+    return TradingSummary(
+        total=len(df),
+        asset=asset,
+        side=side,
+        asset_side=_marginal(cube, ["Asset", "Side"], []),
+        type=_marginal(cube, ["Type"], pnl),
+        hour=_marginal(cube, ["hour"], pnl),
+        status=_marginal(cube, ["Account_status"], []),
+        histograms=histograms,
+    )
+
+
+def trading_summary(df: pd.DataFrame) -> TradingSummary:
+    # Memoizado pelo fingerprint dos dados, no mesmo cache das coleções
+    return cache.get_or_load(("trading_summary", fingerprint(df)), lambda: compute_trading_summary(df))
+
+
+def compare_accounts(frames: dict, urls: dict) -> pd.DataFrame:
+    """Métricas-chave por conta a partir dos frames de um lote (nome da aba -> frame).
+
+    Um groupby por coleção; contas sem linhas numa coleção ficam com NaN.
+    """
+    partes = []
+
+    def _conta(nome):
+        # Chave de agrupamento (conta como texto) ou None se a coleção não veio
+        df = frames.get(nome)
+        campo = directus.account_field(urls[nome]) if nome in urls else None
+        if df is None or df.empty or campo not in df.columns:
+            return None
+        return df[campo].astype(str)
+
+    def _por_conta(nome):
+        chave = _conta(nome)
+        return None if chave is None else frames[nome].groupby(chave, sort=False)
+
+    grupos = _por_conta("Trading History")
+    if grupos is not None:
+        df = frames["Trading History"]
+        metricas = {"Operações": grupos.size()}
+        if "PnL_points" in df.columns:
+            metricas["P&L total (pontos)"] = grupos["PnL_points"].sum()
+            metricas["P&L médio (pontos)"] = grupos["PnL_points"].mean()
+            metricas["Taxa de acerto"] = df["PnL_points"].gt(0).groupby(_conta("Trading History"), sort=False).mean()
+        if "Lots" in df.columns:
+            metricas["Lotes"] = grupos["Lots"].sum()
+        partes.append(pd.DataFrame(metricas))
+
+    grupos = _por_conta("Balance")
+    if grupos is not None and "balance" in frames["Balance"].columns:
+        # Frames de série temporal já vêm ordenados por date_created (normalize)
+        partes.append(grupos["balance"].last().rename("Saldo (último)").to_frame())
+
+    grupos = _por_conta("Drawdown Tracking")
+    if grupos is not None:
+        colunas = [c for c in ("saldo_atual", "hwm", "dd_max", "dd_restante") if c in frames["Drawdown Tracking"].columns]
+        if colunas:
+            ultimos = grupos[colunas].last()
+            ultimos.columns = [f"{c} (último)" for c in colunas]
+            partes.append(ultimos)
+
+    grupos = _por_conta("Ordens")
+    if grupos is not None:
+        partes.append(grupos.size().rename("Ordens").to_frame())
+
+    if not partes:
+        return pd.DataFrame()
+    comparacao = pd.concat(partes, axis=1)
+    comparacao.index.name = "Conta"
+    return comparacao
@@ -0,0 +1,214 @@
+"""Servidor HTTP local que imita os endpoints /items/<coleção> do Directus.
+
+Implementa o subconjunto de query que o dashboard usa: filter[campo][op]
+(_eq, _neq, _in, _gt, _gte, _lt, _lte, _between) inclusive dentro de
+filter[_or][i]/filter[_and][i], limit, offset, sort, fields, meta=filter_count,
+aggregate[func] e groupBy (com funções de data como hour(Opentime)).
+
+    python -m bench.fake_directus --rows 100000 --port 8055
+"""
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+_FILTER = re.compile(r"^filter\[(.+)\]$")
+_DATE_FUNCS = {"year", "month", "week", "day", "weekday", "hour", "minute", "second"}
+
+
+_DATA = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _coerce(serie: pd.Series, valor: str) -> tuple:
+    # (série, valor) comparáveis: números como float, datas ISO como Timestamp UTC
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie, float(valor)
+    if _DATA.match(valor):
+        return pd.to_datetime(serie, errors="coerce", utc=True), pd.to_datetime(valor, utc=True)
+    return serie, valor
+
+
+def _condicao(df: pd.DataFrame, campo: str, op: str, valor: str) -> pd.Series:
+    if campo not in df.columns:
+        raise KeyError(campo)
+    serie = df[campo]
+    if op == "_eq":
+        return serie.astype(str) == valor
+    if op == "_neq":
+        return serie.astype(str) != valor
+    if op == "_in":
+        return serie.astype(str).isin(valor.split(","))
+    if op == "_between":
+        inicio, fim = valor.split(",", 1)
+        serie, inicio = _coerce(serie, inicio)
+        return serie.between(inicio, _coerce(serie, fim)[1])
+    comparacoes = {"_gt": "gt", "_gte": "ge", "_lt": "lt", "_lte": "le"}
+    if op in comparacoes:
+        serie, valor = _coerce(serie, valor)
+        return getattr(serie, comparacoes[op])(valor)
+    raise ValueError(f"operador não suportado: {op}")
+
+
+def apply_filter(df: pd.DataFrame, params: dict) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    grupos = {}
+    for key, valores in params.items():
+        m = _FILTER.match(key)
+        if not m:
+            continue
+        partes = m.group(1).split("][")
+        valor = valores[-1]
+        if partes[0] in ("_or", "_and"):
+            grupos.setdefault(partes[0], []).append(_condicao(df, partes[2], partes[3], valor))
+        else:
+            mask &= _condicao(df, partes[0], partes[1], valor)
+    if grupos.get("_or"):
+        mask &= np.logical_or.reduce(grupos["_or"])
+    for cond in grupos.get("_and", []):
+        mask &= cond
+    return mask
+
+
+def _group_key(df: pd.DataFrame, campo: str) -> tuple:
+    # (nome da coluna no resultado, série) — hour(Opentime) vira Opentime_hour
+    if "(" in campo:
+        func, nome = campo.rstrip(")").split("(")
+        if func not in _DATE_FUNCS:
+            raise ValueError(f"função não suportada: {func}")
+        return f"{nome}_{func}", getattr(pd.to_datetime(df[nome], errors="coerce").dt, func)
+    return campo, df[campo]
+
+
+def aggregate(df: pd.DataFrame, params: dict) -> list:
+    aggs = {}
+    for key, valores in params.items():
+        if key.startswith("aggregate["):
+            aggs[key[len("aggregate["):-1]] = valores[-1].split(",")
+    group_by = [c for v in params.get("groupBy", []) for c in v.split(",") if c]
+
+    chaves = [_group_key(df, campo) for campo in group_by]
+    if chaves:
+        grupos = df.groupby([serie.rename(nome) for nome, serie in chaves], dropna=False, sort=False)
+        itens = list(grupos)
+    else:
+        itens = [((), df)]
+
+    resultado = []
+    for chave, grupo in itens:
+        chave = chave if isinstance(chave, tuple) else (chave,)
+        linha = {nome: (None if pd.isna(v) else v) for (nome, _), v in zip(chaves, chave)}
+        for func, campos in aggs.items():
+            if func == "count" and campos == ["*"]:
+                linha["count"] = len(grupo)
+                continue
+            linha[func] = {}
+            for campo in campos:
+                valores = pd.to_numeric(grupo[campo], errors="coerce")
+                calc = {"count": valores.count, "sum": valores.sum, "avg": valores.mean,
+                        "min": valores.min, "max": valores.max, "countDistinct": valores.nunique}[func]()
+                linha[func][campo] = None if pd.isna(calc) else calc
+        resultado.append(linha)
+    return resultado
+
+
+def query(df: pd.DataFrame, params: dict) -> dict:
+    """Resposta do Directus (`{"data": ..., "meta": ...}`) para `params` no formato de parse_qs."""
+    sub = df[apply_filter(df, params)]
+    if any(k.startswith("aggregate[") for k in params):
+        return {"data": aggregate(sub, params)}
+
+    meta = {}
+    if "filter_count" in params.get("meta", [""])[-1]:
+        meta["filter_count"] = len(sub)
+    for campo in params.get("sort", [""])[-1].split(","):
+        if campo:
+            sub = sub.sort_values(campo.lstrip("-"), ascending=not campo.startswith("-"), kind="stable")
+    offset = int(params.get("offset", ["0"])[-1])
+    limit = int(params.get("limit", ["100"])[-1])
+    sub = sub.iloc[offset:] if limit == -1 else sub.iloc[offset:offset + limit]
+    campos = [c for v in params.get("fields", []) for c in v.split(",") if c]
+    if campos and campos != ["*"]:
+        # Como o Directus, campo inexistente é erro (e não coluna vazia)
+        faltando = [c for c in campos if c not in sub.columns]
+        if faltando:
+            raise KeyError(", ".join(faltando))
+        sub = sub[campos]
+
+    resposta = {"data": sub}
+    if meta:
+        resposta["meta"] = meta
+    return resposta
+
+
+def _dumps(resposta: dict) -> bytes:
+    data = resposta["data"]
+    if isinstance(data, pd.DataFrame):
+        corpo = data.to_json(orient="records", date_format="iso")
+    else:
+        corpo = json.dumps(data, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+    extra = "".join(f', "{k}": {json.dumps(v)}' for k, v in resposta.items() if k != "data")
+    return ('{"data": ' + corpo + extra + "}").encode()
+
+
+def make_handler(dataset: dict):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            nome = url.path.rstrip("/").rsplit("/", 1)[-1]
+            if nome not in dataset:
+                return self._send(404, {"errors": [{"message": f"coleção {nome} não existe"}]})
+            try:
+                corpo = _dumps(query(dataset[nome], parse_qs(url.query)))
+            except (KeyError, ValueError) as e:
+                return self._send(400, {"errors": [{"message": str(e)}]})
+            self._send(200, corpo)
+
+        def _send(self, status: int, corpo):
+            if not isinstance(corpo, bytes):
+                corpo = json.dumps(corpo).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(dataset: dict, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    # Sobe o servidor numa thread daemon; a URL base fica em server.base_url
+    server = ThreadingHTTPServer((host, port), make_handler(dataset))
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}/items"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    from bench import synthetic
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="linhas de Trading History por conta")
+    parser.add_argument("--accounts", nargs="+", default=["1919349374881500200"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8055)
+    args = parser.parse_args()
+
+    dataset = synthetic.make_dataset({account: args.rows for account in args.accounts})
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(dataset))
+    print(f"Fake Directus em http://{args.host}:{args.port}/items/<coleção>")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Benchmark offline do pipeline do dashboard contra o fake Directus.
+
+Para cada tamanho mede fetch (7 coleções em paralelo), decode (JSON -> DataFrame
+do Trading History, com o backend de decode.py), normalize, aggregate (resumo do Trading History) e
+figure (construção + serialização dos gráficos principais).
+
+    python -m bench.run --sizes 1000 10000 100000
+    python -m bench.run --sizes 1000000 --compare bench/results/anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import analytics
+import charts
+import decode
+import directus
+import metrics
+import normalize
+from bench import fake_directus, synthetic
+
+ACCOUNT = "1919349374881500200"
+STAGES = ("fetch", "decode", "normalize", "aggregate", "figure")
+COLLECTIONS = ("Log__Trading_history", "log_balance", "Log__Pnl", "log__drawdown_tracking",
+               "log_estatistica", "log_trading", "coreops_accounts")
+
+
+def _cronometro(func, repeat: int):
+    # Melhor de `repeat` execuções (ms) e o resultado da última
+    melhor = None
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        decorrido = (time.perf_counter() - inicio) * 1000
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return round(melhor, 3), resultado
+
+
+def build_figures(frames: dict, resumo: analytics.TradingSummary) -> list:
+    # Os gráficos mais pesados do dashboard, sem Streamlit
+    figs = []
+    trading = frames["Log__Trading_history"]
+    if "cumulative_pnl" in trading.columns:
+        ordenado = trading.sort_values("date_created")
+        figs.append(go.Figure(charts.series(ordenado["date_created"], ordenado["cumulative_pnl"],
+                                            name="P&L Cumulativo", mode="lines")))
+    draw = frames["log__drawdown_tracking"]
+    fig = go.Figure()
+    for col in ("dd_max", "hwm", "saldo_atual", "saldo_flt"):
+        fig.add_trace(charts.series(draw["date_created"], draw[col], name=col, mode="lines"))
+    figs.append(fig)
+    figs.append(px.pie(resumo.asset, names="Asset", values="count"))
+    figs.append(px.bar(resumo.side, x="Side", y="count"))
+    figs.append(px.bar(resumo.hour, x="hour", y="count"))
+    figs.append(px.scatter(trading, x="Duration", y="Ticks"))
+    return figs
+
+
+def run_size(rows: int, repeat: int) -> dict:
+    dataset = synthetic.make_dataset({ACCOUNT: rows})
+    server = fake_directus.serve(dataset)
+    try:
+        urls = {nome: f"{server.base_url}/{nome}" for nome in COLLECTIONS}
+        resultado = {"rows": rows}
+
+        def _fetch():
+            frames, erros = directus.fetch_all(urls, "bench", ACCOUNT)
+            if erros:
+                raise RuntimeError(erros)
+            return frames
+        resultado["fetch_ms"], brutos = _cronometro(_fetch, repeat)
+
+        url_th = urls["Log__Trading_history"]
+        corpo = directus.get_session().get(url_th, params=directus.build_params(url_th, ACCOUNT)).content
+        resultado["payload_bytes"] = len(corpo)
+        resultado["decode_ms"], _ = _cronometro(lambda: decode.decode_bytes(corpo), repeat)
+
+        resultado["normalize_ms"], frames = _cronometro(
+            lambda: {nome: normalize.normalize(nome, df) for nome, df in brutos.items()}, repeat)
+        resultado["memory_bytes"] = int(sum(df.memory_usage(deep=True).sum() for df in frames.values()))
+
+        trading = frames["Log__Trading_history"]
+        resultado["aggregate_ms"], resumo = _cronometro(lambda: analytics.compute_trading_summary(trading), repeat)
+
+        def _figuras():
+            return sum(len(fig.to_json()) for fig in build_figures(frames, resumo))
+        resultado["figure_ms"], resultado["figure_bytes"] = _cronometro(_figuras, repeat)
+        return resultado
+    finally:
+        server.shutdown()
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(report: dict, anterior: dict | None = None):
+    colunas = [f"{s}_ms" for s in STAGES] + ["payload_bytes", "memory_bytes", "figure_bytes"]
+    print("| rows | " + " | ".join(colunas) + " |")
+    print("|---" * (len(colunas) + 1) + "|")
+    base = {r["rows"]: r for r in (anterior or {}).get("results", [])}
+    for r in report["results"]:
+        celulas = []
+        for c in colunas:
+            valor = f"{r[c]:,}"
+            if r["rows"] in base and base[r["rows"]].get(c):
+                valor += f" ({r[c] / base[r['rows']][c]:.2f}x)"
+            celulas.append(valor)
+        print(f"| {r['rows']:,} | " + " | ".join(celulas) + " |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="linhas de Trading History (até 5000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por etapa (vale a melhor)")
+    parser.add_argument("--output", help="JSON do relatório (padrão: bench/results/report-<data>.json)")
+    parser.add_argument("--compare", help="relatório anterior para mostrar a razão novo/antigo")
+    args = parser.parse_args()
+
+    # O benchmark mede o pipeline; o log de métricas do dashboard fica de fora
+    if "METRICS_LOG" not in os.environ:
+        metrics.LOG_PATH = os.devnull
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "page_size": directus.PAGE_SIZE,
+        "decoder": decode.BACKEND,
+        "results": [],
+    }
+    for rows in args.sizes:
+        print(f"… {rows:,} linhas", flush=True)
+        report["results"].append(run_size(rows, args.repeat))
+
+    saida = args.output or os.path.join("bench", "results", f"report-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    anterior = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            anterior = json.load(f)
+    print_table(report, anterior)
+    print(f"\nRelatório salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
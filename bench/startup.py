@@ -0,0 +1,154 @@
+"""Benchmark de inicialização: tempo de import e tempo até a primeira tela.
+
+Cada medida roda num processo Python novo (imports frios), como no primeiro
+acesso depois de subir o servidor:
+
+- import_ms: import de cada módulo, com o streamlit já carregado (o servidor
+  sempre o tem);
+- login_ms: primeira renderização de login.py (AppTest);
+- dashboard_ms: primeira renderização do dashboard logo após o login, sem e
+  com o aquecimento de preload.py terminado; rerun_ms: o rerun seguinte.
+  O dashboard lê do fake Directus com dados sintéticos.
+
+    python -m bench.startup
+    python -m bench.startup --repeat 5 --compare bench/results/startup-<data>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+MODULES = ("login", "collection", "plotly.express", "pandas")
+ROWS = 5000
+ACCOUNT = "1919349374881500200"
+URL_ENVS = {
+    "URL_ENVIO_ESTATISTICA": "log_estatistica",
+    "URL_ENVIO_DRAWDOWN_TRACKING": "log__drawdown_tracking",
+    "URL_ENVIO_BALANCE": "log_balance",
+    "URL_ENVIO_TRADING": "log_trading",
+    "URL_TRADING_HISTORY": "Log__Trading_history",
+    "URL_LOG_PNL": "Log__Pnl",
+    "URL_COREOPS_ACCOUNTS": "coreops_accounts",
+}
+
+
+def _filho(*args) -> dict:
+    # Roda uma medida num processo novo e lê o JSON que ele imprime na última linha
+    saida = subprocess.run([sys.executable, "-m", "bench.startup", "--child", *args],
+                           capture_output=True, text=True, check=True, env={**os.environ, "METRICS_LOG": os.devnull})
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def _mede_import(modulo: str) -> dict:
+    import importlib
+
+    import streamlit  # noqa: F401
+    inicio = time.perf_counter()
+    importlib.import_module(modulo)
+    return {"ms": round((time.perf_counter() - inicio) * 1000, 3)}
+
+
+def _mede_render(preload: bool) -> dict:
+    # O fake Directus roda no processo pai (URL_* no ambiente): o filho não importa pandas antes do relógio
+    from streamlit.testing.v1 import AppTest
+
+    import preload as aquecimento
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "login.py"),
+                            default_timeout=120)
+    resultado = {}
+    inicio = time.perf_counter()
+    app.run()
+    resultado["login_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+    if preload:
+        # Usuário digitando a senha: o aquecimento termina antes do login
+        while not aquecimento.done():
+            time.sleep(0.01)
+    app.session_state["logged_in"] = True
+    inicio = time.perf_counter()
+    app.run()
+    resultado["dashboard_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+    inicio = time.perf_counter()
+    app.run()
+    resultado["rerun_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return resultado
+
+
+def _melhor(medidas: list) -> dict:
+    return {k: min(m[k] for m in medidas) for k in medidas[0]}
+
+
+def run(repeat: int) -> dict:
+    from bench import fake_directus, synthetic
+
+    resultado = {"import_ms": {}, "render": {}}
+    for modulo in MODULES:
+        resultado["import_ms"][modulo] = _melhor([_filho("import", modulo) for _ in range(repeat)])["ms"]
+    servidor = fake_directus.serve(synthetic.make_dataset({ACCOUNT: ROWS}))
+    try:
+        os.environ.update({var: f"{servidor.base_url}/{colecao}" for var, colecao in URL_ENVS.items()})
+        for nome, preload in (("frio", False), ("com preload", True)):
+            resultado["render"][nome] = _melhor([_filho("render", str(int(preload))) for _ in range(repeat)])
+    finally:
+        servidor.shutdown()
+    return resultado
+
+
+def print_table(report: dict, anterior: dict | None = None):
+    def _celula(valor, base):
+        return f"{valor:,.1f}" + (f" ({valor / base:.2f}x)" if base else "")
+
+    base = (anterior or {}).get("results", {})
+    print("| módulo | import_ms |\n|---|---|")
+    for modulo, ms in report["results"]["import_ms"].items():
+        print(f"| {modulo} | {_celula(ms, base.get('import_ms', {}).get(modulo))} |")
+    colunas = ("login_ms", "dashboard_ms", "rerun_ms")
+    print("\n| cenário | " + " | ".join(colunas) + " |\n" + "|---" * (len(colunas) + 1) + "|")
+    for nome, medidas in report["results"]["render"].items():
+        antes = base.get("render", {}).get(nome, {})
+        print(f"| {nome} | " + " | ".join(_celula(medidas[c], antes.get(c)) for c in colunas) + " |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="processos por medida (vale a melhor)")
+    parser.add_argument("--output", help="JSON do relatório (padrão: bench/results/startup-<data>.json)")
+    parser.add_argument("--compare", help="relatório anterior para mostrar a razão novo/antigo")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        tipo, valor = args.child
+        medida = _mede_import(valor) if tipo == "import" else _mede_render(valor == "1")
+        print(json.dumps(medida))
+        return
+
+    from bench.run import _git_rev
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rows": ROWS,
+        "results": run(args.repeat),
+    }
+    saida = args.output or os.path.join("bench", "results", f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    anterior = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            anterior = json.load(f)
+    print_table(report, anterior)
+    print(f"\nRelatório salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+ASSETS = np.array(["WINZ24", "WDOZ24", "EURUSD", "GBPUSD", "XAUUSD", "US30", "NAS100", "BTCUSD"])
+TYPES = np.array(["market", "limit", "stop"])
+STATUS = np.array(["active", "active", "active", "blown", "passed"])
+
+
+def _datas(inicio: pd.Timestamp, n: int, passo_s: float, rng) -> pd.DatetimeIndex:
+    # Datas crescentes com intervalos aleatórios em torno de `passo_s`
+    passos = rng.exponential(passo_s, n).cumsum()
+    return inicio + pd.to_timedelta(passos, unit="s")
+
+
+def _iso(datas) -> np.ndarray:
+    # Mesmo formato de data que o Directus devolve
+    return pd.DatetimeIndex(datas).strftime("%Y-%m-%dT%H:%M:%S.000Z").to_numpy()
+
+
+def make_account(account: str, rows: int, seed: int = 0) -> dict:
+    """Sete coleções sintéticas de uma conta, com `rows` linhas no Trading History.
+
+    Drawdown tem o mesmo número de snapshots, Balance/PnL/Ordens um décimo;
+    Estatística e coreops_accounts uma linha. Datas em texto ISO, como na API;
+    os valores numéricos já vêm como números.
+    """
+    rng = np.random.default_rng(seed)
+    inicio = pd.Timestamp("2020-01-01")
+    n = rows
+    menor = max(n // 10, 1)
+
+    open_price = rng.uniform(1, 50000, n).round(5)
+    close_price = (open_price * (1 + rng.normal(0, 0.002, n))).round(5)
+    duration = rng.exponential(600, n).round()
+    opentime = _datas(inicio, n, 300, rng)
+    closetime = opentime + pd.to_timedelta(duration, unit="s")
+    trading = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "Account": account,
+        "Asset": rng.choice(ASSETS, n),
+        "Side": rng.choice(["BUY", "SELL"], n),
+        "Type": rng.choice(TYPES, n),
+        "Openprice": open_price,
+        "Closeprice": close_price,
+        "Duration": duration,
+        "Lots": rng.choice([0.01, 0.1, 0.5, 1, 2, 5], n),
+        "Ticks": rng.integers(1, 200, n),
+        "Opentime": _iso(opentime),
+        "Closetime": _iso(closetime),
+        "date_created": _iso(closetime),
+        "date_updated": _iso(closetime),
+        "Account_status": rng.choice(STATUS, n),
+        "Initial_Balance": 100000,
+    })
+
+    saldo = 100000 + rng.normal(0, 150, n).cumsum()
+    flutuante = saldo + rng.normal(0, 80, n)
+    hwm = np.maximum.accumulate(saldo)
+    drawdown = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "account_number": account,
+        "saldo_atual": saldo.round(2),
+        "saldo_flt": flutuante.round(2),
+        "hwm": hwm.round(2),
+        "dd_max": (hwm - 10000).round(2),
+        "dd_restante": (saldo - (hwm - 10000)).round(2),
+        "perda_max": 10000,
+        "max_conta": hwm.round(2),
+        "date_created": _iso(_datas(inicio, n, 300, rng)),
+    })
+
+    datas_menor = _iso(_datas(inicio, menor, 3000, rng))
+    balance = pd.DataFrame({
+        "id": np.arange(1, menor + 1),
+        "account_number": account,
+        "balance": (100000 + rng.normal(0, 400, menor).cumsum()).round(2),
+        "date_created": datas_menor,
+        "date_updated": datas_menor,
+    })
+    pnl = pd.DataFrame({
+        "id": np.arange(1, menor + 1),
+        "Account_number": account,
+        "pnl": rng.normal(0, 300, menor).round(2),
+        "date_created": datas_menor,
+    })
+    ordens = pd.DataFrame({
+        "id": np.arange(1, menor + 1),
+        "account_number": account,
+        "symbol": rng.choice(ASSETS, menor),
+        "side": rng.choice(["BUY", "SELL"], menor),
+        "volume": rng.choice([0.01, 0.1, 1], menor),
+        "date_created": datas_menor,
+    })
+    estatistica = pd.DataFrame([{
+        "id": 1,
+        "account_number": account,
+        "win_rate": round(float(rng.uniform(0.3, 0.7)), 4),
+        "profit_factor": round(float(rng.uniform(0.5, 2.5)), 4),
+        "total_trades": n,
+        "max_drawdown": round(float(rng.uniform(1000, 10000)), 2),
+        "date_created": datas_menor[-1],
+    }])
+    coreops = pd.DataFrame([{
+        "id": 1,
+        "account_number": account,
+        "status": "active",
+        "title": "Challenge 100k",
+        "broker": "Synthetic",
+        "trading_platform": "MT5",
+        "initial_balance": 100000,
+        "current_balance": float(saldo[-1].round(2)),
+    }])
+
+    return {
+        "Log__Trading_history": trading,
+        "log_balance": balance,
+        "Log__Pnl": pnl,
+        "log__drawdown_tracking": drawdown,
+        "log_estatistica": estatistica,
+        "log_trading": ordens,
+        "coreops_accounts": coreops,
+    }
+
+
+def make_dataset(accounts: dict, seed: int = 0) -> dict:
+    # {conta: linhas} -> {coleção: frame com todas as contas}
+    partes = {}
+    for i, (account, rows) in enumerate(accounts.items()):
+        for nome, df in make_account(account, rows, seed + i).items():
+            partes.setdefault(nome, []).append(df)
+    dataset = {}
+    for nome, dfs in partes.items():
+        df = pd.concat(dfs, ignore_index=True)
+        df["id"] = np.arange(1, len(df) + 1)
+        dataset[nome] = df
+    return dataset
@@ -0,0 +1,295 @@
+import dataclasses
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+import requests
+
+import directus
+import metrics
+import normalize
+import store
+
+# Configuráveis por variável de ambiente
+CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "512"))
+
+
+def frame_bytes(df) -> int:
+    # Aceita também resumos ({nome: DataFrame | escalar} ou dataclass), arrays e figuras serializadas
+    if dataclasses.is_dataclass(df):
+        return frame_bytes(vars(df))
+    if isinstance(df, dict):
+        return sum(frame_bytes(v) for v in df.values())
+    if isinstance(df, pd.DataFrame):
+        return int(df.memory_usage(deep=True).sum())
+    if isinstance(df, np.ndarray):
+        return int(df.nbytes)
+    if isinstance(df, (str, bytes)):
+        return len(df)
+    return 64
+
+
+def make_key(env: str, url: str, account: str, params: dict | None = None) -> tuple:
+    if params is None:
+        params = directus.build_params(url, account)
+    return (env, url, account, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+
+class FrameCache:
+    """Cache TTL + LRU de DataFrames, limitado pela memória total dos frames.
+
+    Vive no nível do módulo, então sobrevive aos reruns do Streamlit. Os frames
+    devolvidos são compartilhados: quem precisar alterar deve fazer `.copy()`.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024)):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expira_em, tamanho, df)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expira_em, tamanho, df = entry
+            if expira_em < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return df
+
+    def put(self, key, df: pd.DataFrame, tamanho: int | None = None):
+        # `tamanho` (bytes) substitui frame_bytes para valores que ele não sabe medir (ex.: figuras)
+        tamanho = frame_bytes(df) if tamanho is None else tamanho
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if tamanho > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, tamanho, df)
+            self._total += tamanho
+            while self._total > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, env: str | None = None, account: str | None = None):
+        with self._lock:
+            for key in list(self._entries):
+                if (env is None or key[0] == env) and (account is None or key[2] == account):
+                    self._drop(key)
+
+    def clear(self):
+        self.invalidate()
+
+    def _drop(self, key):
+        _, tamanho, _ = self._entries.pop(key)
+        self._total -= tamanho
+
+
+frames = FrameCache()
+
+# Single-flight: chave -> Future da carga em andamento. Sessões que pedem a
+# mesma chave ao mesmo tempo esperam a carga da primeira e recebem o mesmo
+# objeto (sem cópia por sessão), em vez de repetir a chamada ao Directus.
+_em_voo = {}
+_em_voo_lock = threading.Lock()
+# chave -> (carregadas, total) das cargas em andamento, lido por quem espera
+_progresso = {}
+
+# Resultado de uma carga interrompida por algo que não é erro da carga (ex.: o
+# RerunException/StopException do Streamlit na sessão que carregava): quem
+# espera carrega de novo em vez de receber a exceção de outra sessão.
+_RECARREGAR = object()
+
+
+def _reserva(key):
+    # (valor do cache, None) | (None, Future de outra sessão) | (None, Future novo, esta sessão carrega).
+    # A checagem do cache fica dentro do lock: quem termina grava no cache antes de sair de _em_voo.
+    with _em_voo_lock:
+        value = frames.get(key)
+        if value is not None:
+            return value, None, False
+        if key in _em_voo:
+            return None, _em_voo[key], False
+        futuro = _em_voo[key] = Future()
+        return None, futuro, True
+
+
+def _libera(key, value=None, erro: Exception | None = None):
+    with _em_voo_lock:
+        futuro = _em_voo.pop(key, None)
+        _progresso.pop(key, None)
+    if futuro is None:
+        return
+    if erro is not None:
+        futuro.set_exception(erro)
+    else:
+        futuro.set_result(value)
+
+
+def get_or_load(key, loader):
+    # Para resultados que não são coleções inteiras (ex.: agregações)
+    while True:
+        value, futuro, dono = _reserva(key)
+        if value is not None:
+            return value
+        if dono:
+            break
+        with metrics.timer("coalesced", chave=str(key[0])):
+            value = futuro.result()
+        if value is not _RECARREGAR:
+            return value
+    try:
+        value = loader()
+    except Exception as e:
+        _libera(key, erro=e)
+        raise
+    except BaseException:
+        _libera(key, _RECARREGAR)
+        raise
+    frames.put(key, value)
+    _libera(key, value)
+    return value
+
+
+def query_key(env: str, url: str, account, fields=None, periodo=None) -> tuple:
+    # Projeção e período fazem parte da chave: cada combinação é uma entrada distinta
+    return make_key(env, url, account, directus.build_params(url, account, fields, periodo))
+
+
+def fetch_all(env: str, urls: dict, bearer: str, account: str, timeout=directus.DEFAULT_TIMEOUT,
+              on_progress=None, sync: bool = False, fields: dict | None = None, periodo=None,
+              max_age: float | None = None) -> tuple:
+    # Mesmo contrato de directus.fetch_all, mas só vai à rede para o que não está no cache.
+    # Com `sync`, o que falta vem do banco local + linhas novas desde o watermark (store.sync).
+    # `fields` (nome -> colunas) projeta cada coleção; ausente = todas as colunas.
+    # `periodo` (início, fim) restringe as coleções de histórico (directus.time_field).
+    # `max_age` (com `sync`): cópia local mais nova que isso é usada sem ir à rede.
+    # Coleções que outra sessão já está buscando não geram nova chamada: espera-se a dela.
+    # A carga roda numa thread própria (_carrega), fora do script: um rerun da sessão
+    # que a iniciou não a interrompe, e `on_progress` é chamado só aqui, na thread de quem chamou.
+    fields = fields or {}
+    result = {}
+    erros = {}
+    faltando = {}
+    chaves = {}
+    futuros = {}
+    for nome, url in urls.items():
+        key = chaves[nome] = query_key(env, url, account, fields.get(nome), periodo)
+        df, futuro, dono = _reserva(key)
+        if df is not None:
+            result[nome] = df
+            continue
+        futuros[nome] = futuro
+        if dono:
+            faltando[nome] = url
+
+    if faltando:
+        if isinstance(account, tuple):
+            # Lote de contas: uma chamada _in por coleção (store.sync é por conta)
+            base = directus.fetch_batch
+        else:
+            base = store.fetcher(env, max_age) if sync else directus.fetch
+        threading.Thread(target=_carrega, name="carga", daemon=True,
+                         args=(base, faltando, {n: chaves[n] for n in faltando}, bearer, account, timeout,
+                               fields, periodo)).start()
+
+    if futuros:
+        inicio = time.perf_counter()
+        pendentes = set(futuros.values())
+        while pendentes:
+            _, pendentes = wait(pendentes, timeout=0.25)
+            if on_progress is not None:
+                on_progress({nome: _progresso.get(chaves[nome], (0, None)) for nome in futuros})
+        espera_ms = round((time.perf_counter() - inicio) * 1000, 3)
+        recarregar = {}
+        for nome, futuro in futuros.items():
+            if nome not in faltando:
+                metrics.record("coalesced", env=env, colecao=directus.collection_name(urls[nome]), ms=espera_ms)
+            try:
+                df = futuro.result()
+            except requests.RequestException as e:
+                result[nome] = pd.DataFrame()
+                erros[nome] = str(e)
+                continue
+            if df is _RECARREGAR:
+                recarregar[nome] = urls[nome]
+            else:
+                result[nome] = df
+        if recarregar:
+            novos, novos_erros = fetch_all(env, recarregar, bearer, account, timeout, on_progress, sync, fields,
+                                           periodo, max_age)
+            result.update(novos)
+            erros.update(novos_erros)
+    return result, erros
+
+
+def _carrega(base, faltando: dict, chaves: dict, bearer: str, account, timeout, fields: dict, periodo):
+    # Thread de uma carga single-flight: busca, normaliza, grava no cache e resolve os Futures
+    def _fetch_normalizado(url, *args, **kwargs):
+        # Normaliza ainda na thread do fetch; o cache guarda o frame já tipado
+        df = base(url, *args, **kwargs)
+        with metrics.timer("normalize", colecao=directus.collection_name(url), rows=len(df)):
+            return normalize.normalize(directus.collection_name(url), df)
+
+    def _progress(progresso):
+        for nome, valor in progresso.items():
+            _progresso[chaves[nome]] = valor
+
+    try:
+        novos, erros = directus.fetch_all(faltando, bearer, account, timeout, _progress,
+                                          fetcher=_fetch_normalizado, fields=fields, periodo=periodo)
+        for nome, key in chaves.items():
+            if nome in erros:
+                _libera(key, erro=requests.RequestException(erros[nome]))
+            else:
+                frames.put(key, novos[nome])
+                _libera(key, novos[nome])
+    except Exception as e:
+        for key in chaves.values():
+            _libera(key, erro=e)
+    finally:
+        # Nada fica pendurado: o que não foi resolvido acima é recarregado por quem espera
+        for key in chaves.values():
+            _libera(key, _RECARREGAR)
+
+
+# Pré-carregamento em segundo plano: um executor por processo, e cada chave
+# só é agendada uma vez enquanto estiver pendente.
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+_pendentes = set()
+_pendentes_lock = threading.Lock()
+
+
+def prefetch(env: str, urls: dict, bearer: str, account: str, timeout=directus.DEFAULT_TIMEOUT,
+             sync: bool = False, fields: dict | None = None, periodo=None, max_age: float | None = None):
+    # Agenda a busca das coleções que ainda não estão no cache e retorna na hora.
+    # Não chama nada do Streamlit: roda fora do contexto do script.
+    fields = fields or {}
+    with _pendentes_lock:
+        faltando = {}
+        for nome, url in urls.items():
+            key = query_key(env, url, account, fields.get(nome), periodo)
+            if key not in _pendentes and frames.get(key) is None:
+                _pendentes.add(key)
+                faltando[nome] = url
+    if not faltando:
+        return
+
+    def _run():
+        try:
+            fetch_all(env, faltando, bearer, account, timeout, sync=sync, fields=fields, periodo=periodo,
+                      max_age=max_age)
+        finally:
+            with _pendentes_lock:
+                for nome, url in faltando.items():
+                    _pendentes.discard(query_key(env, url, account, fields.get(nome), periodo))
+
+    _prefetch_pool.submit(_run)
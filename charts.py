@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Pontos enviados ao navegador por série e a partir de quantas linhas usar WebGL
+MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "2000"))
+WEBGL_THRESHOLD = int(os.getenv("CHART_WEBGL_THRESHOLD", "5000"))
+
+
+def _as_float(x) -> np.ndarray:
+    # Datas (inclusive com fuso, como as do Directus) viram inteiros na unidade do dtype
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = x.astype("int64")
+    return x.to_numpy(dtype=np.float64)
+
+
+def lttb(x, y, n: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: índices de `n` pontos que preservam o formato da série.
+
+    `x` precisa estar ordenado e `y` sem NaN.
+    """
+    tamanho = len(x)
+    if n >= tamanho or n < 3:
+        return np.arange(tamanho)
+    xs = _as_float(x)
+    ys = np.asarray(y, dtype=np.float64)
+
+    # n - 2 buckets entre o primeiro e o último ponto, que sempre entram
+    bordas = np.linspace(1, tamanho - 1, n - 1).astype(np.int64)
+    idx = np.empty(n, dtype=np.int64)
+    idx[0], idx[-1] = 0, tamanho - 1
+    a = 0
+    for i in range(n - 2):
+        ini, fim = bordas[i], bordas[i + 1]
+        prox_fim = bordas[i + 2] if i + 2 < len(bordas) else tamanho
+        media_x = xs[fim:prox_fim].mean()
+        media_y = ys[fim:prox_fim].mean()
+        area = np.abs((xs[a] - media_x) * (ys[ini:fim] - ys[a]) - (xs[a] - xs[ini:fim]) * (media_y - ys[a]))
+        a = ini + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(x, y, n: int) -> np.ndarray:
+    # Mínimo e máximo de cada bucket (n/2 buckets); preserva picos, ideal para drawdown
+    tamanho = len(x)
+    if n >= tamanho or n < 2:
+        return np.arange(tamanho)
+    ys = np.asarray(y, dtype=np.float64)
+    idx = []
+    for bucket in np.array_split(np.arange(tamanho), n // 2):
+        idx.append(bucket[np.argmin(ys[bucket])])
+        idx.append(bucket[np.argmax(ys[bucket])])
+    return np.unique(np.asarray(idx, dtype=np.int64))
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+def decimate(x, y, max_points: int = MAX_POINTS, method: str = "lttb") -> tuple:
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    validos = x.notna() & y.notna()
+    if not validos.all():
+        x, y = x[validos].reset_index(drop=True), y[validos].reset_index(drop=True)
+    if len(x) <= max_points:
+        return x, y
+    idx = METHODS[method](x, y.to_numpy(), max_points)
+    return x.iloc[idx], y.iloc[idx]
+
+
+def series(x, y, name: str, max_points: int = MAX_POINTS, webgl_threshold: int = WEBGL_THRESHOLD,
+           method: str = "lttb", **kwargs):
+    """go.Scatter/go.Scattergl já reduzido à resolução visível.
+
+    Acima de `webgl_threshold` linhas usa Scattergl, que não tem `line_shape='spline'`
+    nem faz sentido com marcador em cada ponto: ambos são descartados.
+    """
+    total = len(x)
+    xs, ys = decimate(x, y, max_points, method)
+    if total > webgl_threshold:
+        kwargs.pop("line_shape", None)
+        if kwargs.get("mode") == "lines+markers":
+            kwargs["mode"] = "lines"
+        return go.Scattergl(x=xs, y=ys, name=name, **kwargs)
+    return go.Scatter(x=xs, y=ys, name=name, **kwargs)
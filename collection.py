@@ -1,204 +1,399 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import requests
+import time
 from streamlit_option_menu import option_menu
-import os
 
+import aggregates
+import analytics
+import cache
+import config
+import metrics
+import figures
+import snapshot
+import store
+import table
+import timeseries
+import warmer
+
+
+def barra_progresso():
+    # Callback para fetch_all: uma barra única somando as páginas de todas as coleções
+    barra = st.progress(0.0, text="Carregando coleções...")
+
+    def _atualiza(progresso):
+        carregadas = sum(c for c, _ in progresso.values())
+        total = sum(t or 0 for _, t in progresso.values())
+        if total:
+            barra.progress(min(carregadas / total, 1.0), text=f"Carregando coleções... {carregadas:,}/{total:,} linhas")
+    return barra, _atualiza
+
+
+PERIODOS = {"Tudo": None, "Hoje": 0, "Últimos 7 dias": 6, "Últimos 30 dias": 29, "Personalizado": None}
+
+
+def seletor_periodo():
+    # (início, fim) em ISO/UTC enviado ao Directus como filter[campo][_between], ou None.
+    # Limites em dias inteiros: a chave do cache só muda quando o período muda.
+    escolha = st.sidebar.selectbox("Período (UTC)", list(PERIODOS), key="periodo")
+    hoje = pd.Timestamp.now(tz="UTC").normalize()
+    if escolha == "Personalizado":
+        padrao = (hoje - pd.Timedelta(days=6), hoje)
+        datas = st.sidebar.date_input("Datas", value=padrao, key="periodo_datas")
+        # No meio da escolha o widget devolve só a data inicial: vale como janela de um dia,
+        # nunca como "histórico inteiro" (None), que dispararia o download completo
+        datas = tuple(datas) if isinstance(datas, (tuple, list)) else (datas,)
+        datas = datas or padrao
+        inicio, fim = pd.Timestamp(datas[0]), pd.Timestamp(datas[-1])
+    elif PERIODOS[escolha] is None:
+        return None
+    else:
+        inicio, fim = hoje - pd.Timedelta(days=PERIODOS[escolha]), hoje
+    fim = fim + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    return inicio.strftime("%Y-%m-%dT%H:%M:%S"), fim.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def janela_temporal(datas: pd.Series, key: str) -> pd.Series:
+    # Seletor do intervalo visível; os gráficos são reamostrados dentro dele,
+    # então aproximar a janela mostra mais detalhe sem enviar mais pontos.
+    inicio, fim = datas.min(), datas.max()
+    if pd.isna(inicio) or inicio == fim:
+        return datas.notna()
+    inicio, fim = inicio.to_pydatetime(), fim.to_pydatetime()
+    selecao = st.slider("Janela", min_value=inicio, max_value=fim, value=(inicio, fim),
+                        format="DD/MM/YY HH:mm", key=key)
+    return datas.between(selecao[0], selecao[1])
+
+
+def graficos_trading(resumo: analytics.TradingSummary, df_trading: pd.DataFrame | None = None):
+    # Gráficos da aba Trading History. Tudo que é agregado vem de `resumo`;
+    # `df_trading` (linhas normalizadas) só é usado nos gráficos ponto a ponto
+    # e pode faltar no modo agregado no servidor.
+    # As figuras ficam no cache de figuras pela chave dos dados (figures.py).
+    # plotly.express é importado aqui, não no topo: a primeira tela não paga por ele (ver preload.py).
+    import plotly.express as px
+
+    st.markdown("<div class='section-title'>Análise de Trading</div>", unsafe_allow_html=True)
+    hist = resumo.histograms
+    colunas = df_trading.columns if df_trading is not None else []
+    # O resumo sai do frame: com as linhas, o fingerprint delas basta
+    chave = figures.fingerprint(df_trading if df_trading is not None else resumo)
+
+    # 1. Distribuição de operações por ativo
+    if not resumo.asset.empty:
+        st.write("### Distribuição de Operações por Ativo")
+
+        def fig_assets():
+            fig = px.pie(resumo.asset, names='Asset', values='count', title='Distribuição por Ativo')
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            return fig
+        plotar(fig_assets, "assets", chave=chave)
+
+    # 2. Análise de operações por direção (Side)
+    if not resumo.side.empty:
+        st.write("### Análise por Direção de Operação")
+        cols = st.columns(2)
+
+        # Contagem por direção
+        def fig_side():
+            side_count = resumo.side.rename(columns={'count': 'Count'})
+            return px.bar(side_count, x='Side', y='Count',
+                          color='Side', text='Count',
+                          title='Quantidade de Operações por Direção')
+        plotar(fig_side, "side", cols[0], chave=chave)
+
+        # Análise cruzada de Asset por Side
+        if not resumo.asset_side.empty:
+            def fig_asset_side():
+                asset_side = resumo.asset_side.pivot_table(index='Asset', columns='Side', values='count',
+                                                           fill_value=0, observed=True)
+                return px.bar(asset_side,
+                              title='Distribuição de Direção por Ativo',
+                              labels={'value': 'Quantidade', 'variable': 'Direção'})
+            plotar(fig_asset_side, "asset_side", cols[1], chave=chave)
+
+    # 3. Análise de preços
+    if 'Openprice' in hist and 'Closeprice' in hist:
+        st.write("### Análise de Preços")
+
+        # Gráfico de P&L por operação ao longo do tempo
+        if 'cumulative_pnl' in colunas:
+            na_janela = janela_temporal(df_trading['date_created'], key='janela_pnl')
+
+            datas = df_trading['date_created'][na_janela]
+            janela = (datas.min(), datas.max())
+            plotar(lambda: figures.pnl_cumulativo(df_trading[na_janela]), "pnl", chave=(chave, janela))
+
+        # Distribuição de preços de abertura e fechamento
+        cols = st.columns(2)
+        plotar(lambda: figures.histograma(*hist['Openprice'], title='Distribuição de Preços de Abertura',
+                                  label='Preço de Abertura'), "hist_Openprice", cols[0], chave=chave)
+        plotar(lambda: figures.histograma(*hist['Closeprice'], title='Distribuição de Preços de Fechamento',
+                                  label='Preço de Fechamento'), "hist_Closeprice", cols[1], chave=chave)
+
+    # 4. Análise de duração das operações
+    if 'Duration' in hist:
+        st.write("### Análise de Duração das Operações")
+
+        # Histograma de duração
+        plotar(lambda: figures.histograma(*hist['Duration'], title='Distribuição da Duração das Operações',
+                                  label='Duração (s)'), "hist_Duration", chave=chave)
+
+        # Duração x Resultado
+        if 'PnL_points' in colunas:
+            plotar(lambda: px.scatter(df_trading, x='Duration', y='PnL_points',
+                                      color='Side', title='Relação entre Duração e Resultado',
+                                      labels={'Duration': 'Duração (s)', 'PnL_points': 'Resultado (pontos)'}),
+                   "dur_pnl", chave=chave)
+
+    # 6. Análise de volume (Lots)
+    if 'Lots' in hist or 'Lots' in resumo.asset.columns:
+        st.write("### Análise de Volume")
+
+        # Distribuição de lotes
+        if 'Lots' in hist:
+            plotar(lambda: figures.histograma(*hist['Lots'], title='Distribuição de Tamanho das Operações',
+                                      label='Lotes'), "hist_Lots", chave=chave)
+
+        # Volume por ativo se disponível
+        if 'Lots' in resumo.asset.columns:
+            def fig_asset_vol():
+                asset_volume = resumo.asset.sort_values('Lots', ascending=False)
+                return px.bar(asset_volume, x='Asset', y='Lots',
+                              title='Volume Total por Ativo',
+                              labels={'Asset': 'Ativo', 'Lots': 'Volume Total (lotes)'})
+            plotar(fig_asset_vol, "asset_vol", chave=chave)
+
+    # 7. Análise por tipo de operação
+    if not resumo.type.empty:
+        st.write("### Análise por Tipo de Operação")
+
+        def fig_type():
+            fig = px.pie(resumo.type, values='count', names='Type',
+                         title='Distribuição por Tipo de Operação')
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            return fig
+        plotar(fig_type, "type", chave=chave)
+
+        # Performance por tipo se PnL calculado
+        if 'PnL_points' in resumo.type.columns:
+            plotar(lambda: px.bar(resumo.type, x='Type', y='PnL_points',
+                                  title='P&L Médio por Tipo de Operação',
+                                  labels={'Type': 'Tipo', 'PnL_points': 'P&L Médio (pontos)'}),
+                   "type_pnl", chave=chave)
+
+    # 8. Análise de horários (se disponível)
+    if not resumo.hour.empty:
+        st.write("### Análise de Horários")
+
+        # Distribuição de operações por hora
+        plotar(lambda: px.bar(resumo.hour, x='hour', y='count',
+                              title='Distribuição de Operações por Hora do Dia',
+                              labels={'hour': 'Hora', 'count': 'Quantidade'}),
+               "hour", chave=chave)
+
+        # Performance por hora se PnL calculado
+        if 'PnL_points' in resumo.hour.columns:
+            plotar(lambda: px.line(resumo.hour, x='hour', y='PnL_points',
+                                   title='P&L Médio por Hora do Dia',
+                                   labels={'hour': 'Hora', 'PnL_points': 'P&L Médio (pontos)'}),
+                   "hour_pnl", chave=chave)
+
+    # 9. Análise de Ticks (se disponível)
+    if 'Ticks' in hist:
+        st.write("### Análise de Ticks")
+
+        # Distribuição de ticks
+        plotar(lambda: figures.histograma(*hist['Ticks'], title='Distribuição de Ticks das Operações',
+                                  label='Ticks'), "hist_Ticks", chave=chave)
+
+        # Relação entre ticks e duração
+        if 'Duration' in colunas:
+            plotar(lambda: px.scatter(df_trading, x='Duration', y='Ticks',
+                                      title='Relação entre Duração e Ticks',
+                                      labels={'Duration': 'Duração (s)', 'Ticks': 'Ticks'}),
+                   "ticks_dur", chave=chave)
+
+    # 10. Status da conta (se disponível)
+    if not resumo.status.empty:
+        st.write("### Análise de Status da Conta")
+
+        def fig_status():
+            fig = px.pie(resumo.status, values='count', names='Account_status',
+                         title='Distribuição por Status da Conta')
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            return fig
+        plotar(fig_status, "status", chave=chave)
+
+
+def comparacao_lote(empresa: str, urls: dict, bearer: str, periodo=None):
+    # Várias contas de uma vez: cada coleção é buscada uma vez com filtro _in
+    # (directus.fetch_batch) e separada por conta num único groupby.
+    texto = st.text_area("Account Numbers (um por linha ou separados por vírgula):")
+    contas = tuple(sorted({c.strip() for c in texto.replace(",", "\n").splitlines() if c.strip()}))
+    if not contas:
+        return
+
+    if st.button("🔄 Atualizar agora"):
+        cache.frames.invalidate(env=empresa, account=contas)
+
+    # Estatística não entra na comparação
+    lote = {nome: urls[nome] for nome in ("Trading History", "Balance", "Drawdown Tracking", "Ordens")}
+    barra, atualiza = barra_progresso()
+    frames, erros = cache.fetch_all(empresa, lote, bearer=bearer, account=contas, on_progress=atualiza,
+                                    fields=config.CAMPOS, periodo=periodo)
+    barra.empty()
+    for nome, erro in erros.items():
+        st.error(f"Erro ({nome}): {erro}")
+
+    comparacao = analytics.compare_accounts(frames, lote).reindex(list(contas))
+    st.subheader(f"Comparação de {len(contas)} contas")
+    st.dataframe(comparacao)
+
+    metricas = [c for c in comparacao.columns if comparacao[c].notna().any()]
+    if metricas:
+        metrica = st.selectbox("Métrica", metricas)
+
+        def fig_comparacao():
+            import plotly.express as px
+            fig = px.bar(comparacao.reset_index(), x='Conta', y=metrica, title=f'{metrica} por Conta')
+            fig.update_xaxes(type='category')
+            return fig
+        plotar(fig_comparacao, "comparacao_lote", chave=(figures.fingerprint(comparacao), metrica))
+
+
+# Abas que precisam de outras coleções além da própria
+DEPENDENCIAS = {
+    "Drawdown Tracking": ["Balance"],
+}
+
+def tabela_bruta(empresa: str, aba: str, url: str | None, bearer: str, account: str, df: pd.DataFrame,
+                 sync: bool = False, periodo=None):
+    # Tabela com todas as colunas, baixada só quando aberta (url=None: `df` já é completo)
+    if not st.checkbox("Mostrar dados brutos", key=f"brutas_{aba}"):
+        return
+    if url is not None and config.CAMPOS.get(aba) is not None:
+        completos, erros = cache.fetch_all(empresa, {aba: url}, bearer=bearer, account=account, sync=sync,
+                                           periodo=periodo)
+        for nome, erro in erros.items():
+            st.error(f"Erro ({nome}): {erro}")
+        df = completos[aba]
+    tabela_paginada(df, key=f"tabela_{aba}")
+
+
+def painel_snapshots(empresa: str, urls: dict, coreops_url: str, bearer: str, account: str) -> str | None:
+    # Salva a conta inteira em disco (Arrow) ou escolhe um snapshot para abrir no lugar da API
+    with st.sidebar.expander("📸 Snapshots"):
+        if st.button("Salvar snapshot da conta", disabled=not snapshot.valid_name(account),
+                     help="Account Number só com letras, números, _ e -"):
+            with st.spinner("Baixando todas as coleções..."):
+                completos, erros = cache.fetch_all(empresa, {**urls, "coreops_accounts": coreops_url},
+                                                   bearer=bearer, account=account)
+            if erros:
+                st.error("Snapshot não salvo: " + "; ".join(f"{n}: {e}" for n, e in erros.items()))
+            else:
+                pasta = snapshot.save(empresa, account, completos, {**urls, "coreops_accounts": coreops_url})
+                st.success(f"Salvo em {pasta}")
+        disponiveis = {m["path"]: m for m in snapshot.list_snapshots(empresa, account)}
+        return st.selectbox(
+            "Fonte dos dados", [None] + list(disponiveis), key="snapshot",
+            format_func=lambda p: "API (ao vivo)" if p is None else
+            f"Snapshot {disponiveis[p]['fetched_at']} (até {disponiveis[p]['watermark'] or '-'})",
+        )
 
 
-def request(url: str, bearer: str, account: str) -> pd.DataFrame:
-    headers = {"Authorization": f"Bearer {bearer}"}
-
-    if url.endswith("Log__Trading_history"):
-        params = {"filter[Account][_eq]": account, "limit": -1}
-    elif url.endswith("log_balance") or url.endswith("log__drawdown_tracking") or url.endswith("log_estatistica") or url.endswith("log_trading"):
-        params = {"filter[account_number][_eq]": account, "limit": -1}
-    elif url.endswith("Log__Pnl"):
-        params = {"filter[Account_number][_eq]": account, "limit": -1}
-    elif url.endswith("coreops_accounts"):
-        params = {"filter[account_number][_eq]": account, "limit": 1}
-    else:
-        params = {}
-
-    try:
-        response = requests.get(url=url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json().get("data", [])
-        return pd.DataFrame(data)
-    except requests.HTTPError as e:
-        st.error(f"Erro: {e}")
-        return pd.DataFrame()
-
-
-def indicador_card(titulo, valor):
-    fig = go.Figure(go.Indicator(
-        mode="number",
-        value=valor,
-        number={"font": {"size": 36}},
-        title={"text": f"<b>{titulo}</b>", "font": {"size": 16}}
-    ))
-    fig.update_layout(
-        height=160,
-        margin=dict(t=20, b=10, l=10, r=10),
-        template="simple_white"
-    )
-    return fig
+def tabela_paginada(df: pd.DataFrame, key: str):
+    # Ordenação, filtro e paginação feitos aqui; o navegador recebe só a página visível
+    if df.empty:
+        st.dataframe(df, use_container_width=True)
+        return
+    colunas = list(df.columns)
+    cols = st.columns([3, 1, 3, 3])
+    ordenar = cols[0].selectbox("Ordenar por", [None] + colunas, key=f"{key}_sort",
+                                format_func=lambda c: "(original)" if c is None else c)
+    crescente = cols[1].toggle("Crescente", value=True, key=f"{key}_asc")
+    filtrar = cols[2].selectbox("Filtrar coluna", colunas, key=f"{key}_filtro_col")
+    texto = cols[3].text_input("Contém", key=f"{key}_filtro")
+
+    ordem = table.visible_rows(df, ordenar, crescente, filtrar, texto.strip())
+    cols = st.columns([1, 1, 4])
+    tamanho = cols[0].selectbox("Linhas por página", table.PAGE_SIZES, index=1, key=f"{key}_tamanho")
+    paginas = table.page_count(len(ordem), tamanho)
+    if st.session_state.get(f"{key}_pagina", 1) > paginas:
+        # O filtro diminuiu o número de páginas
+        st.session_state[f"{key}_pagina"] = paginas
+    numero = cols[1].number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{key}_pagina")
+    inicio = (numero - 1) * tamanho
+    cols[2].caption(f"Linhas {min(inicio + 1, len(ordem)):,}–{min(inicio + tamanho, len(ordem)):,} "
+                    f"de {len(ordem):,} (total {len(df):,})")
+    st.dataframe(table.page(df, ordem, numero, tamanho), use_container_width=True)
+
+
+def plotar(fig, chart: str, alvo=None, chave=None):
+    # st.plotly_chart instrumentado: `build_ms` é o tempo desde o gráfico anterior
+    # (ou metrics.mark()), `ms` o do plotly_chart (serialização + envio).
+    # Com `chave` (fingerprint dos dados), `fig` é a função que constrói a figura e
+    # só é chamada se (chart, chave) não estiver no cache de figuras.
+    # `figure_bytes` é a estimativa do cache de figuras (arrays das traces); com o painel
+    # de debug ligado, uma figura recém-construída é serializada para medir o JSON e o tempo.
+    alvo = alvo or st
+    extra = {}
+    hit = False
+    if chave is not None:
+        fig, extra["figure_bytes"], hit = figures.get_or_build(chart, chave, fig)
+        extra["cache_hit"] = hit
+    build_ms = metrics.since_mark_ms()
+    if st.session_state.get("debug") and not hit:
+        inicio = time.perf_counter()
+        extra["figure_bytes"] = len(fig.to_json())
+        extra["serialize_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+    with metrics.timer("figure", chart=chart, build_ms=build_ms, **extra):
+        alvo.plotly_chart(fig, use_container_width=True)
+    metrics.mark()
+
+
+def painel_debug(inicio: float):
+    # Eventos desta execução do script (e de threads de prefetch no mesmo intervalo)
+    eventos = metrics.since(inicio)
+    with st.expander("🛠️ Debug: tempos desta execução", expanded=False):
+        if not eventos:
+            st.write("Nenhum evento registrado.")
+            return
+        df = pd.DataFrame(eventos)
+        df["ts"] = pd.to_datetime(df["ts"], unit="s")
+        for evento, grupo in df.groupby("evento", sort=False):
+            st.write(f"**{evento}**")
+            st.dataframe(grupo.dropna(axis=1, how="all").drop(columns="evento"))
+        st.caption(f"Log completo em {metrics.LOG_PATH}")
 
 
 def main():
+    inicio = time.time()
+    metrics.mark()
+    dashboard()
+    if st.session_state.get("debug"):
+        painel_debug(inicio)
+
+
+def dashboard():
     st.set_page_config(page_title="PropHub", layout="wide")
 
     if "env" not in st.session_state:
         st.session_state.env = "blueberry"
 
+    # CSS servido como arquivo estático (static/, enableStaticServing em .streamlit/config.toml):
+    # o navegador baixa uma vez e guarda em cache, em vez de receber o <style> a cada rerun.
     st.markdown(
     """
-    <style>
-    /* Global adjustments for a sleek dark theme */
-    body {
-        background-color: #1a1a2e; /* Darker, more neutral background */
-        color: #e0e0e0; /* Lighter text for contrast */
-        font-family: 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;
-    }
-
-    /* Main Title - PropHub */
-    .main-title {
-        font-size: 68px; /* Slightly larger for impact */
-        font-weight: 700; /* Bolder */
-        color: #400705; /* White/off-white for main title */
-        text-align: center;
-        margin-bottom: 5px; /* Reduced space to subtitle */
-        letter-spacing: 2px; /* A bit of letter spacing for elegance */
-        text-shadow: 0 4px 8px rgba(0, 0, 0, 0.4); /* Subtle text shadow for depth */
-        background: linear-gradient(90deg, #400705, #9f5d59); /* Gradient for a modern touch */
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        line-height: 1.2;
-    }
-
-    /* Subtitle - Dashboard de Verificação das Coleções do Directus */
-    .sub-title {
-        font-size: 26px; /* Slightly larger and more prominent */
-        color: #a0a0a0; /* Softer grey for subtitle */
-        text-align: center;
-        margin-bottom: 50px; /* More space below the subtitle */
-        font-weight: 300; /* Lighter font weight for elegance */
-        letter-spacing: 0.8px;
-        line-height: 1.5;
-        text-shadow: 0 1px 3px rgba(0, 0, 0, 0.2); /* Very subtle shadow */
-    }
-
-    /* Info Card - (If you decide to use it later, example refined style) */
-    .info-card {
-        background-color: #2a2a3e; /* Darker, sophisticated background for cards */
-        padding: 20px;
-        border-radius: 12px; /* Softer rounded corners */
-        box-shadow: 0 6px 15px rgba(0, 0, 0, 0.3); /* More pronounced, soft shadow */
-        margin-bottom: 20px;
-        border: 1px solid #3c3c5a; /* Subtle border for definition */
-    }
-
-    /* Section Title - (If you decide to use it later, example refined style) */
-    .section-title {
-        font-size: 24px;
-        font-weight: 600;
-        color: #f0f2f6; /* Matching main title color for hierarchy */
-        margin-top: 30px;
-        margin-bottom: 15px;
-        border-bottom: 2px solid #3a3a4e; /* Subtle underline effect */
-        padding-bottom: 5px;
-        letter-spacing: 1px;
-    }
-    </style>
+    <link rel="stylesheet" href="app/static/prophub.css">
     <div class="main-title">PropHub</div>
     <div class="sub-title">Dashboard de Verificação das Coleções do Directus</div>
     """,
     unsafe_allow_html=True,
     )
 
-    # ─── Novo CSS para o seletor ────────────────────────────────────────
-    st.markdown(
-    """
-    <style>
-    /* Container centralizado com padding e sombra suave */
-    [data-testid="stRadio"] > div {
-        display: flex !important;
-        justify-content: center;
-        gap: 20px; /* Mais espaço entre os botões */
-        margin-bottom: 40px;
-        padding: 12px;
-        border-radius: 18px; /* Cantos mais arredondados para um visual suave */
-        background: #25252b; /* Fundo mais escuro e elegante */
-        box-shadow: 0 8px 20px rgba(0,0,0,0.6); /* Sombra mais profunda */
-        border: 1px solid #3a3a42; /* Borda sutil para definição */
-    }
-
-    /* Esconde o círculo padrão do rádio */
-    [data-testid="stRadio"] input[type="radio"] {
-        display: none;
-    }
-
-    /* Cada label vira um "botão" customizado */
-    [data-testid="stRadio"] label > span {
-        position: relative;
-        display: inline-flex;
-        align-items: center;
-        gap: 10px;
-        padding: 16px 36px; /* Mais preenchimento para um toque premium */
-        border-radius: 12px; /* Cantos arredondados nos botões */
-        background: #303036; /* Cor de fundo padrão do botão */
-        color: #c0c0c0; /* Cor de texto padrão, mais clara */
-        font-size: 20px; /* Fonte ligeiramente maior */
-        font-weight: 500;
-        cursor: pointer;
-        transition: all 0.3s ease; /* Transições suaves para todos os efeitos */
-        border: 1px solid #45454d; /* Borda sutil para cada botão */
-        letter-spacing: 0.5px; /* Espaçamento leve entre letras */
-    }
-
-    /* Bolinha custom antes do texto */
-    [data-testid="stRadio"] label > span::before {
-        content: "";
-        width: 18px; /* Bolinha maior */
-        height: 18px;
-        border: 2px solid #777; /* Borda da bolinha */
-        border-radius: 50%;
-        background: transparent;
-        transition: border-color 0.3s, background 0.3s;
-        box-shadow: inset 0 0 0 2px #303036; /* Sombra interna para profundidade */
-    }
-
-    /* Hover sobre o "botão" */
-    [data-testid="stRadio"] label:hover > span {
-        background: #3c3c43; /* Fundo mais claro no hover */
-        color: #ffffff; /* Texto branco no hover */
-        transform: translateY(-3px); /* Leve levantamento */
-        box-shadow: 0 5px 15px rgba(0,0,0,0.4); /* Sombra mais visível no hover */
-    }
-
-    /* Estado selecionado: fundo diferenciado + texto branco */
-    [data-testid="stRadio"] label[data-selected="true"] > span {
-        background: #6a057d; /* Um roxo profundo para o estado selecionado */
-        color: #ffffff; /* Texto branco puro */
-        border-color: #6a057d; /* Borda combinando */
-        box-shadow: 0 6px 16px rgba(106, 5, 125, 0.5); /* Sombra vibrante para destaque */
-        transform: translateY(-1px); /* Mantém um leve levantamento */
-    }
-    /* Bolinha preenchida no selecionado */
-    [data-testid="stRadio"] label[data-selected="true"] > span::before {
-        background: #ffffff; /* Preenchimento branco */
-        border-color: #ffffff; /* Borda branca */
-        box-shadow: none; /* Remove a sombra interna quando preenchida */
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-    )
-
     # --- Seletor de Empresa customizado ────────────────────────────────
-    env_keys = ["blueberry","p4f","demo"]
+    env_keys = list(config.ENVS)
     empresa = st.radio(
         "",
         env_keys,
@@ -213,30 +408,76 @@ def main():
     )
 
 
-    # ─── Carrega .env conforme seleção ─────────────────────────────────
-    from dotenv import load_dotenv
-    load_dotenv(dotenv_path=f".env.{empresa}", override=True)
+    # ─── Config do ambiente (lida uma vez por processo, imutável) ──────
+    cfg = config.get(empresa)
+    TRADING_HISTORY   = cfg.trading_history
+    COREOPS_ACCOUNTS  = cfg.coreops_accounts
+    BEARER            = cfg.bearer
+    urls = cfg.urls
 
-    ESTATISTICA       = os.getenv("URL_ENVIO_ESTATISTICA")
-    DRAWDOWN_TRACKING = os.getenv("URL_ENVIO_DRAWDOWN_TRACKING")
-    BALANCE           = os.getenv("URL_ENVIO_BALANCE")
-    ORDENS            = os.getenv("URL_ENVIO_TRADING")
-    TRADING_HISTORY   = os.getenv("URL_TRADING_HISTORY")
-    PNL               = os.getenv("URL_LOG_PNL")
-    COREOPS_ACCOUNTS  = os.getenv("URL_COREOPS_ACCOUNTS")
-    BEARER            = os.getenv("BEARER_BB__PROD__")
+    st.sidebar.toggle("Painel de debug", value=False, key="debug",
+                      help="Mostra latência, bytes, linhas, memória e tempo de cada gráfico desta execução")
+    periodo = seletor_periodo()
+    modo = st.sidebar.radio("Modo", ["Conta", "Lote de contas"], horizontal=True)
+    if modo == "Lote de contas":
+        comparacao_lote(empresa, urls, BEARER, periodo)
+        return
 
     account = st.text_input("Digite o Account Number:", "1919349374881500200")
+    carregamento_lazy = st.sidebar.toggle("Carregar somente a aba aberta", value=True,
+                                          help="Busca primeiro a aba selecionada e pré-carrega as outras em segundo plano")
+    sincronizar = st.sidebar.toggle("Sincronização incremental", value=False,
+                                    help="Guarda o histórico da conta em disco e baixa só as linhas novas")
+    agregar_no_servidor = st.sidebar.toggle("Agregar Trading History no servidor", value=False,
+                                            help="Calcula os gráficos com aggregate/groupBy do Directus; "
+                                                 "as linhas só são baixadas ao abrir a tabela bruta")
 
     if account:
 
-        df1 = request(url=TRADING_HISTORY, bearer=BEARER, account=account)
-        df2 = request(url=BALANCE, bearer=BEARER, account=account)
-        df3 = request(url=PNL, bearer=BEARER, account=account)
-        df4 = request(url=DRAWDOWN_TRACKING, bearer=BEARER, account=account)
-        df5 = request(url=ESTATISTICA, bearer=BEARER, account=account)
-        df6 = request(url=ORDENS,bearer=BEARER,account=account)
-        df_info = request(url=COREOPS_ACCOUNTS, bearer=BEARER, account=account)
+        if st.button("🔄 Atualizar agora"):
+            cache.frames.invalidate(env=empresa, account=account)
+
+        # Contas da watchlist do warmer.py: lidas do banco local enquanto a cópia estiver fresca
+        aquecidas, max_age = warmer.fresh_accounts(empresa)
+        if account in aquecidas:
+            sincronizar = True
+            st.sidebar.caption("⚡ Conta aquecida pelo warmer: dados do banco local")
+        else:
+            max_age = None
+
+        snap = painel_snapshots(empresa, urls, COREOPS_ACCOUNTS, BEARER, account) if snapshot.AVAILABLE else None
+        if snap is not None:
+            # O snapshot já tem todas as coleções completas: sem lazy e sem agregação no servidor
+            carregamento_lazy = agregar_no_servidor = False
+
+        # No modo agregado, as linhas do Trading History só vêm se a tabela bruta for aberta
+        pular = {"Trading History"} if agregar_no_servidor else set()
+
+        if snap is not None:
+            # Lido por memory map uma vez por processo; não vai à rede
+            frames = cache.get_or_load(("snapshot", snap), lambda: snapshot.load(snap))
+            origem = {**urls, "coreops_accounts": COREOPS_ACCOUNTS}
+            # Mesmo recorte de período da API, aplicado localmente
+            frames = {nome: store.no_periodo(df, origem[nome], periodo) if origem.get(nome) else df
+                      for nome, df in frames.items()}
+            erros = {}
+        elif not carregamento_lazy:
+            # Todas as coleções em paralelo; o que já está no cache não vai à rede
+            barra, atualiza = barra_progresso()
+            baixar = {nome: url for nome, url in urls.items() if nome not in pular}
+            frames, erros = cache.fetch_all(empresa, {**baixar, "coreops_accounts": COREOPS_ACCOUNTS},
+                                            bearer=BEARER, account=account, on_progress=atualiza,
+                                            sync=sincronizar, fields=config.CAMPOS, periodo=periodo,
+                                            max_age=max_age)
+            barra.empty()
+        else:
+            frames, erros = cache.fetch_all(empresa, {"coreops_accounts": COREOPS_ACCOUNTS},
+                                            bearer=BEARER, account=account, sync=sincronizar,
+                                            fields=config.CAMPOS, periodo=periodo, max_age=max_age)
+        for nome, erro in erros.items():
+            st.error(f"Erro ({nome}): {erro}")
+
+        df_info = frames["coreops_accounts"]
 
         if not df_info.empty:
             with st.expander("📌 Informações da Conta", expanded=True):
@@ -259,229 +500,74 @@ def main():
                     f"""<div class='info-card'><strong>Saldo Atual:</strong> {info.get('current_balance', '-')}</div>""",
                     unsafe_allow_html=True)
 
-        colecoes = {
-            "Trading History": df1,
-            "Balance": df2,
-            "PnL": df3,
-            "Drawdown Tracking": df4,
-            "Estatística": df5,
-            "Ordens":df6
-        }
-
         aba = option_menu(
             menu_title=None,
-            options=list(colecoes.keys()),
+            options=list(urls.keys()),
             icons=["bar-chart", "credit-card", "cash-coin", "exclamation-triangle", "calculator"],
             orientation="horizontal"
         )
 
+        if carregamento_lazy:
+            # Primeiro a aba selecionada (e o que ela declara precisar), depois o resto em segundo plano
+            necessarias = [nome for nome in [aba] + DEPENDENCIAS.get(aba, []) if nome not in pular]
+            barra, atualiza = barra_progresso()
+            novos, erros = cache.fetch_all(empresa, {nome: urls[nome] for nome in necessarias},
+                                           bearer=BEARER, account=account, on_progress=atualiza,
+                                           sync=sincronizar, fields=config.CAMPOS, periodo=periodo,
+                                           max_age=max_age)
+            barra.empty()
+            for nome, erro in erros.items():
+                st.error(f"Erro ({nome}): {erro}")
+            frames.update(novos)
+            cache.prefetch(empresa, {nome: url for nome, url in urls.items() if nome not in frames and nome not in pular},
+                           bearer=BEARER, account=account, sync=sincronizar, fields=config.CAMPOS,
+                           periodo=periodo, max_age=max_age)
+
+        colecoes = frames
+
+        if aba == "Trading History" and agregar_no_servidor:
+            try:
+                resumo = cache.get_or_load(
+                    cache.make_key(empresa, TRADING_HISTORY, account,
+                                   {"aggregate": "trading_summary", "periodo": periodo}),
+                    lambda: aggregates.trading_summary(TRADING_HISTORY, BEARER, account, periodo=periodo),
+                )
+            except requests.RequestException as e:
+                st.error(f"Erro: {e}")
+                return
+            metrics.mark()
+            st.subheader(f"Coleção: {aba}")
+            plotar(lambda: figures.indicador_card("Total de Linhas", resumo.total), "total_linhas", chave=resumo.total)
+            tabela_bruta(empresa, aba, TRADING_HISTORY, BEARER, account, pd.DataFrame(), sync=sincronizar,
+                         periodo=periodo)
+            graficos_trading(resumo)
+            return
+
         df = colecoes[aba]
 
+        metrics.mark()
         st.subheader(f"Coleção: {aba}")
-        st.plotly_chart(indicador_card("Total de Linhas", len(df)), use_container_width=True)
+        plotar(lambda: figures.indicador_card("Total de Linhas", len(df)), "total_linhas", chave=len(df))
 
         if not df.empty:
-            st.dataframe(df)
+            tabela_bruta(empresa, aba, None if snap else urls[aba], BEARER, account, df, sync=sincronizar,
+                         periodo=periodo)
 
             if aba == "Trading History":
-                # Processar e converter dados
-                df_trading = df.copy()
-
-                # Convertendo colunas de data e numéricas
-                date_cols = ['date_created', 'date_updated', 'Opentime', 'Closetime']
-                for col in date_cols:
-                    if col in df_trading.columns:
-                        df_trading[col] = pd.to_datetime(df_trading[col], errors='coerce')
-
-                numeric_cols = ['Openprice', 'Closeprice', 'Duration', 'Lots', 'Ticks', 'Initial_Balance']
-                for col in numeric_cols:
-                    if col in df_trading.columns:
-                        df_trading[col] = pd.to_numeric(df_trading[col], errors='coerce')
-
-                st.markdown("<div class='section-title'>Análise de Trading</div>", unsafe_allow_html=True)
-
-                # 1. Distribuição de operações por ativo
-                if 'Asset' in df_trading.columns:
-                    st.write("### Distribuição de Operações por Ativo")
-                    fig_assets = px.pie(df_trading, names='Asset', title='Distribuição por Ativo')
-                    fig_assets.update_traces(textposition='inside', textinfo='percent+label')
-                    st.plotly_chart(fig_assets, use_container_width=True)
-
-                # 2. Análise de operações por direção (Side)
-                if 'Side' in df_trading.columns:
-                    st.write("### Análise por Direção de Operação")
-                    cols = st.columns(2)
-
-                    # Contagem por direção
-                    side_count = df_trading['Side'].value_counts().reset_index()
-                    side_count.columns = ['Side', 'Count']
-                    fig_side = px.bar(side_count, x='Side', y='Count',
-                                      color='Side', text='Count',
-                                      title='Quantidade de Operações por Direção')
-                    cols[0].plotly_chart(fig_side, use_container_width=True)
-
-                    # Análise cruzada de Asset por Side
-                    if 'Asset' in df_trading.columns:
-                        asset_side = pd.crosstab(df_trading['Asset'], df_trading['Side'])
-                        fig_asset_side = px.bar(asset_side,
-                                                title='Distribuição de Direção por Ativo',
-                                                labels={'value': 'Quantidade', 'variable': 'Direção'})
-                        cols[1].plotly_chart(fig_asset_side, use_container_width=True)
-
-                # 3. Análise de preços
-                if all(col in df_trading.columns for col in ['Openprice', 'Closeprice']):
-                    st.write("### Análise de Preços")
-
-                    # Calcular P&L bruto por operação
-                    if 'Side' in df_trading.columns:
-                        df_trading['PnL_points'] = df_trading.apply(
-                            lambda x: (x['Closeprice'] - x['Openprice']) if x['Side'] == 'BUY'
-                            else (x['Openprice'] - x['Closeprice']) if x['Side'] == 'SELL'
-                            else 0, axis=1
-                        )
-
-                        # Gráfico de P&L por operação ao longo do tempo
-                        if 'date_created' in df_trading.columns:
-                            df_pnl_time = df_trading.sort_values('date_created')
-                            df_pnl_time['cumulative_pnl'] = df_pnl_time['PnL_points'].cumsum()
-
-                            fig_pnl = px.line(df_pnl_time, x='date_created', y='cumulative_pnl',
-                                              title='P&L Cumulativo ao Longo do Tempo (em pontos)',
-                                              labels={'cumulative_pnl': 'P&L Cumulativo', 'date_created': 'Data'})
-                            st.plotly_chart(fig_pnl, use_container_width=True)
-
-                    # Distribuição de preços de abertura e fechamento
-                    cols = st.columns(2)
-                    fig_open = px.histogram(df_trading, x='Openprice',
-                                            title='Distribuição de Preços de Abertura',
-                                            labels={'Openprice': 'Preço de Abertura', 'count': 'Frequência'})
-                    cols[0].plotly_chart(fig_open, use_container_width=True)
-
-                    fig_close = px.histogram(df_trading, x='Closeprice',
-                                             title='Distribuição de Preços de Fechamento',
-                                             labels={'Closeprice': 'Preço de Fechamento', 'count': 'Frequência'})
-                    cols[1].plotly_chart(fig_close, use_container_width=True)
-
-                # 4. Análise de duração das operações
-                if 'Duration' in df_trading.columns:
-                    st.write("### Análise de Duração das Operações")
-
-                    # Histograma de duração
-                    fig_duration = px.histogram(df_trading, x='Duration',
-                                                title='Distribuição da Duração das Operações',
-                                                labels={'Duration': 'Duração (s)', 'count': 'Frequência'},
-                                                nbins=20)
-                    st.plotly_chart(fig_duration, use_container_width=True)
-
-                    # Duração x Resultado
-                    if 'PnL_points' in df_trading.columns:
-                        fig_dur_pnl = px.scatter(df_trading, x='Duration', y='PnL_points',
-                                                 color='Side', title='Relação entre Duração e Resultado',
-                                                 labels={'Duration': 'Duração (s)', 'PnL_points': 'Resultado (pontos)'})
-                        st.plotly_chart(fig_dur_pnl, use_container_width=True)
-
-
-                # 6. Análise de volume (Lots)
-                if 'Lots' in df_trading.columns:
-                    st.write("### Análise de Volume")
-
-                    # Distribuição de lotes
-                    fig_lots = px.histogram(df_trading, x='Lots',
-                                            title='Distribuição de Tamanho das Operações',
-                                            labels={'Lots': 'Lotes', 'count': 'Frequência'})
-                    st.plotly_chart(fig_lots, use_container_width=True)
-
-                    # Volume por ativo se disponível
-                    if 'Asset' in df_trading.columns:
-                        asset_volume = df_trading.groupby('Asset')['Lots'].sum().sort_values(
-                            ascending=False).reset_index()
-                        fig_asset_vol = px.bar(asset_volume, x='Asset', y='Lots',
-                                               title='Volume Total por Ativo',
-                                               labels={'Asset': 'Ativo', 'Lots': 'Volume Total (lotes)'})
-                        st.plotly_chart(fig_asset_vol, use_container_width=True)
-
-                # 7. Análise por tipo de operação
-                if 'Type' in df_trading.columns:
-                    st.write("### Análise por Tipo de Operação")
-
-                    type_counts = df_trading['Type'].value_counts().reset_index()
-                    type_counts.columns = ['Type', 'Count']
-
-                    fig_type = px.pie(type_counts, values='Count', names='Type',
-                                      title='Distribuição por Tipo de Operação')
-                    fig_type.update_traces(textposition='inside', textinfo='percent+label')
-                    st.plotly_chart(fig_type, use_container_width=True)
-
-                    # Performance por tipo se PnL calculado
-                    if 'PnL_points' in df_trading.columns:
-                        type_pnl = df_trading.groupby('Type')['PnL_points'].mean().reset_index()
-                        fig_type_pnl = px.bar(type_pnl, x='Type', y='PnL_points',
-                                              title='P&L Médio por Tipo de Operação',
-                                              labels={'Type': 'Tipo', 'PnL_points': 'P&L Médio (pontos)'})
-                        st.plotly_chart(fig_type_pnl, use_container_width=True)
-
-                # 8. Análise de horários (se disponível)
-                if 'Opentime' in df_trading.columns:
-                    st.write("### Análise de Horários")
-
-                    # Adicionar hora do dia
-                    df_trading['hour'] = df_trading['Opentime'].dt.hour
-
-                    # Distribuição de operações por hora
-                    hour_counts = df_trading['hour'].value_counts().sort_index().reset_index()
-                    hour_counts.columns = ['Hour', 'Count']
-
-                    fig_hour = px.bar(hour_counts, x='Hour', y='Count',
-                                      title='Distribuição de Operações por Hora do Dia',
-                                      labels={'Hour': 'Hora', 'Count': 'Quantidade'})
-                    st.plotly_chart(fig_hour, use_container_width=True)
-
-                    # Performance por hora se PnL calculado
-                    if 'PnL_points' in df_trading.columns:
-                        hour_pnl = df_trading.groupby('hour')['PnL_points'].mean().reset_index()
-                        fig_hour_pnl = px.line(hour_pnl, x='hour', y='PnL_points',
-                                               title='P&L Médio por Hora do Dia',
-                                               labels={'hour': 'Hora', 'PnL_points': 'P&L Médio (pontos)'})
-                        st.plotly_chart(fig_hour_pnl, use_container_width=True)
-
-                # 9. Análise de Ticks (se disponível)
-                if 'Ticks' in df_trading.columns:
-                    st.write("### Análise de Ticks")
-
-                    # Distribuição de ticks
-                    fig_ticks = px.histogram(df_trading, x='Ticks',
-                                             title='Distribuição de Ticks das Operações',
-                                             labels={'Ticks': 'Ticks', 'count': 'Frequência'},
-                                             nbins=20)
-                    st.plotly_chart(fig_ticks, use_container_width=True)
-
-                    # Relação entre ticks e duração
-                    if 'Duration' in df_trading.columns:
-                        fig_ticks_dur = px.scatter(df_trading, x='Duration', y='Ticks',
-                                                   title='Relação entre Duração e Ticks',
-                                                   labels={'Duration': 'Duração (s)', 'Ticks': 'Ticks'})
-                        st.plotly_chart(fig_ticks_dur, use_container_width=True)
-
-                # 10. Status da conta (se disponível)
-                if 'Account_status' in df_trading.columns:
-                    st.write("### Análise de Status da Conta")
-
-                    status_counts = df_trading['Account_status'].value_counts().reset_index()
-                    status_counts.columns = ['Status', 'Count']
-
-                    fig_status = px.pie(status_counts, values='Count', names='Status',
-                                        title='Distribuição por Status da Conta')
-                    fig_status.update_traces(textposition='inside', textinfo='percent+label')
-                    st.plotly_chart(fig_status, use_container_width=True)
+                # Métricas numa única passada, memoizadas pelo fingerprint do frame normalizado
+                graficos_trading(analytics.trading_summary(df), df)
 
             elif aba != "Estatística":
                 st.write("### Gráfico de Frequências por Data (se aplicável)")
                 for col in ["date_created", "created_at", "data_ref"]:
                     if col in df.columns:
-                        df[col] = pd.to_datetime(df[col], errors='coerce')
-                        df_freq = df[col].dt.date.value_counts().sort_index()
-                        fig = px.bar(x=df_freq.index, y=df_freq.values, labels={"x": "Data", "y": "Frequência"})
-                        st.plotly_chart(fig, use_container_width=True)
+                        def fig_frequencia():
+                            # df vem do cache compartilhado: não alterar no lugar
+                            import plotly.express as px
+                            datas = pd.to_datetime(df[col], errors='coerce')
+                            df_freq = datas.dt.date.value_counts().sort_index()
+                            return px.bar(x=df_freq.index, y=df_freq.values, labels={"x": "Data", "y": "Frequência"})
+                        plotar(fig_frequencia, "frequencia_datas", chave=(figures.fingerprint(df), col))
                         break
 
             if aba == "Estatística":
@@ -491,88 +577,30 @@ def main():
                 for key, value in row.items():
                     try:
                         valor = float(value)
-                        cards.append(indicador_card(key, valor))
+                        cards.append((key, valor))
                     except:
                         continue
 
-                for i in range(0, len(cards), 3):
-                    cols = st.columns(3)
-                    for j in range(3):
-                        if i + j < len(cards):
-                            cols[j].plotly_chart(cards[i + j], use_container_width=True)
+                # Uma figura só com todos os cards em grade de 3 colunas
+                if cards:
+                    plotar(lambda: figures.indicadores(cards, colunas=3), "estatistica_cards",
+                           chave=figures.fingerprint(df))
 
             if aba == "Drawdown Tracking":
-                df_draw = df.copy()
-                df_draw['date_created'] = pd.to_datetime(df_draw['date_created'], errors='coerce')
-                df_draw.sort_values(by='date_created', inplace=True)
-                for col in ['dd_restante', 'saldo_atual', 'saldo_flt', 'dd_max', 'perda_max', 'max_conta', 'hwm']:
-                    if col in df_draw.columns:
-                        df_draw[col] = pd.to_numeric(df_draw[col], errors='coerce')
-
-                df_balance = df2.copy()
-                if 'date_created' in df_balance.columns and 'balance' in df_balance.columns:
-                    df_balance['date_created'] = pd.to_datetime(df_balance['date_created'], errors='coerce')
-                    df_balance['balance'] = pd.to_numeric(df_balance['balance'], errors='coerce')
-
-                fig = go.Figure()
-
-                fig.add_trace(go.Scatter(
-                    x=df_draw['date_created'],
-                    y=df_draw['dd_max'],
-                    name='DD Máximo',
-                    mode='lines',
-                    line=dict(width=2.5, color='#EF553B', dash='dot'),
-                    line_shape='spline'
-                ))
-
-                fig.add_trace(go.Scatter(
-                    x=df_draw['date_created'],
-                    y=df_draw['hwm'],
-                    name='HWM',
-                    mode='lines',
-                    line=dict(width=2.5, color='#00CC96'),
-                    line_shape='spline'
-                ))
-
-                fig.add_trace(go.Scatter(
-                    x=df_draw['date_created'],
-                    y=df_draw['saldo_atual'],
-                    name='Saldo Atual',
-                    mode='lines',
-                    line=dict(width=2.5, color='#636EFA'),
-                    line_shape='spline'
-                ))
-
-                fig.add_trace(go.Scatter(
-                    x=df_draw['date_created'],
-                    y=df_draw['saldo_flt'],
-                    name='Saldo Flutuante',
-                    mode='lines+markers',
-                    marker=dict(size=4),
-                    line=dict(width=2.5, color='#AB63FA'),
-                    line_shape='spline'
-                ))
-
-                fig.update_layout(
-                    template='plotly_dark',
-                    margin=dict(l=20, r=20, t=30, b=30),
-                    hovermode='x unified',
-                    legend=dict(
-                        orientation='h',
-                        yanchor='top',
-                        y=1.1,
-                        xanchor='right',
-                        x=1,
-                        font=dict(size=12)
-                    ),
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=True, zeroline=False)
-                )
-
-                st.plotly_chart(fig, use_container_width=True)
+                # Snapshots + último saldo (as-of) e rollups por minuto/hora/dia, memoizados
+                bruto, niveis = timeseries.drawdown_series(df, colecoes["Balance"])
+                janela = bruto['date_created'][janela_temporal(bruto['date_created'], key='janela_drawdown')]
+                resolucao, df_draw = timeseries.pick_resolution(bruto, niveis, janela.min(), janela.max())
+                st.caption(f"Resolução: {resolucao} ({len(df_draw):,} pontos)")
+
+                if 'drawdown_balance' in df_draw.columns:
+                    # HWM e drawdown recalculados do Balance com máximo acumulado
+                    cols = st.columns(2)
+                    cols[0].metric("Drawdown atual (Balance)", f"{df_draw['drawdown_balance'].iloc[-1]:,.2f}")
+                    cols[1].metric("Drawdown máximo na janela (Balance)", f"{df_draw['drawdown_balance'].min():,.2f}")
 
-            if aba == "Ordens":
-                st.dataframe(df6)
+                chave = (figures.fingerprint(df, colecoes["Balance"]), resolucao, janela.min(), janela.max())
+                plotar(lambda: figures.drawdown(df_draw), "drawdown", chave=chave)
 
         else:
             st.warning("Nenhum dado encontrado para essa coleção.")
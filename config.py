@@ -0,0 +1,83 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from dotenv import dotenv_values
+
+ENVS = ("blueberry", "p4f", "demo")
+
+
+@dataclass(frozen=True)
+class EnvConfig:
+    """Endpoints e credenciais de um ambiente (.env.<nome>).
+
+    Imutável e lido uma única vez por processo: pode ser compartilhado entre
+    sessões e threads, ao contrário de os.environ.
+    """
+    name: str
+    estatistica: str | None
+    drawdown_tracking: str | None
+    balance: str | None
+    ordens: str | None
+    trading_history: str | None
+    pnl: str | None
+    coreops_accounts: str | None
+    bearer: str | None
+    senha: str | None
+
+    @property
+    def urls(self) -> dict:
+        # Nome da aba -> URL da coleção
+        return {
+            "Trading History": self.trading_history,
+            "Balance": self.balance,
+            "PnL": self.pnl,
+            "Drawdown Tracking": self.drawdown_tracking,
+            "Estatística": self.estatistica,
+            "Ordens": self.ordens,
+        }
+
+
+# Colunas que cada aba usa nos gráficos; só elas são baixadas (`id` e o campo
+# da conta entram sempre). None = coleção inteira. A tabela bruta do dashboard busca tudo.
+CAMPOS = {
+    "Trading History": ("Asset", "Side", "Type", "Openprice", "Closeprice", "Duration", "Lots", "Ticks",
+                        "Opentime", "date_created", "Account_status"),
+    "Drawdown Tracking": ("date_created", "dd_restante", "saldo_atual", "saldo_flt", "dd_max",
+                          "perda_max", "max_conta", "hwm"),
+    "Balance": ("date_created", "balance"),
+    "PnL": ("date_created",),
+    "Ordens": ("date_created",),
+    "Estatística": None,
+    "coreops_accounts": ("status", "title", "broker", "trading_platform", "initial_balance",
+                         "current_balance"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get(env: str) -> EnvConfig:
+    # Sem o arquivo, cai para as variáveis do processo (ex.: deploy sem .env)
+    valores = dotenv_values(f".env.{env}")
+
+    def _valor(nome):
+        return valores.get(nome) or os.environ.get(nome)
+
+    return EnvConfig(
+        name=env,
+        estatistica=_valor("URL_ENVIO_ESTATISTICA"),
+        drawdown_tracking=_valor("URL_ENVIO_DRAWDOWN_TRACKING"),
+        balance=_valor("URL_ENVIO_BALANCE"),
+        ordens=_valor("URL_ENVIO_TRADING"),
+        trading_history=_valor("URL_TRADING_HISTORY"),
+        pnl=_valor("URL_LOG_PNL"),
+        coreops_accounts=_valor("URL_COREOPS_ACCOUNTS"),
+        bearer=_valor("BEARER_BB__PROD__"),
+        senha=_valor("SENHA"),
+    )
+
+
+def load_all(envs=ENVS) -> dict:
+    # Carrega vários ambientes em paralelo (visões entre empresas)
+    with ThreadPoolExecutor(max_workers=len(envs)) as pool:
+        return dict(zip(envs, pool.map(get, envs)))
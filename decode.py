@@ -0,0 +1,116 @@
+"""Decodificação das respostas do Directus direto em colunas.
+
+Em vez de `response.json()["data"]` (uma lista com um dict por linha) seguido de
+`pd.DataFrame(data)`, as linhas vão para buffers por coluna e o DataFrame é
+montado a partir deles. Backends (a escolha fica em `_backend`):
+
+- `ijson` com backend C: lê a resposta em streaming; só uma linha existe como
+  objeto Python por vez, então o pico de memória não inclui a lista de dicts.
+  Gasta mais CPU que um parse completo.
+- `orjson`: parse completo (ainda com a lista de dicts), mas bem mais rápido
+  que o json da stdlib.
+- stdlib `json` (o caminho antigo), sempre disponível.
+"""
+import io
+import json
+import os
+
+import pandas as pd
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _backend() -> str:
+    # DIRECTUS_DECODER força um backend. Sem ele: orjson é o mais rápido e, com a
+    # paginação (directus.PAGE_SIZE), a lista de dicts já fica limitada a uma página;
+    # sem paginação (PAGE_SIZE=0) a resposta é ilimitada e o streaming compensa.
+    # O ijson em Python puro é mais lento que um parse completo: só vale com backend C.
+    disponiveis = ["json"]
+    if orjson is not None:
+        disponiveis.insert(0, "orjson")
+    if ijson is not None and ijson.backend in ("yajl2_c", "yajl2_cffi"):
+        sem_paginacao = os.getenv("DIRECTUS_PAGE_SIZE", "5000") == "0"
+        disponiveis.insert(0 if sem_paginacao else len(disponiveis), "ijson")
+    escolhido = os.getenv("DIRECTUS_DECODER")
+    return escolhido if escolhido in disponiveis else disponiveis[0]
+
+
+BACKEND = _backend()
+
+# Erros de corpo malformado em qualquer backend (o JSONError do ijson não é ValueError)
+DECODE_ERRORS = (ValueError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+class _CountingReader:
+    # Conta os bytes lidos da resposta em streaming (para as métricas)
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes = 0
+
+    def read(self, n=-1):
+        chunk = self.raw.read(n)
+        self.bytes += len(chunk)
+        return chunk
+
+
+def _append(colunas: dict, linha: dict, n: int):
+    # Acrescenta a linha `n` aos buffers; colunas novas são preenchidas com None
+    for key, value in linha.items():
+        coluna = colunas.get(key)
+        if coluna is None:
+            coluna = colunas[key] = [None] * n
+        coluna.append(value)
+    for coluna in colunas.values():
+        if len(coluna) <= n:
+            coluna.append(None)
+
+
+def columns_to_frame(colunas: dict) -> pd.DataFrame:
+    return pd.DataFrame(colunas) if colunas else pd.DataFrame()
+
+
+def _decode_stream(fp) -> tuple:
+    colunas, meta, n, builder = {}, {}, 0, None
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == "data.item" and event == "end_map":
+                _append(colunas, builder.value, n)
+                n += 1
+                builder = None
+        elif prefix == "data.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix.startswith("meta.") and event in ("number", "string", "boolean", "null"):
+            meta[prefix[len("meta."):]] = value
+    return columns_to_frame(colunas), meta
+
+
+def decode_bytes(conteudo: bytes) -> tuple:
+    """(DataFrame, meta) de um corpo de resposta já lido."""
+    if BACKEND == "ijson":
+        return _decode_stream(io.BytesIO(conteudo))
+    payload = orjson.loads(conteudo) if BACKEND == "orjson" else json.loads(conteudo)
+    if not isinstance(payload, dict):
+        raise ValueError("resposta do Directus não é um objeto JSON")
+    return pd.DataFrame(payload.get("data") or []), payload.get("meta") or {}
+
+
+def decode(response) -> tuple:
+    """(DataFrame, meta, bytes) de uma resposta `requests` feita com stream=True."""
+    if BACKEND == "ijson":
+        response.raw.decode_content = True
+        leitor = _CountingReader(response.raw)
+        df, meta = _decode_stream(leitor)
+        return df, meta, leitor.bytes
+    conteudo = response.content
+    df, meta = decode_bytes(conteudo)
+    return df, meta, len(conteudo)
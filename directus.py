@@ -0,0 +1,280 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+import decode
+import metrics
+
+# (connect, read) em segundos, aplicado a cada chamada individual
+DEFAULT_TIMEOUT = (5, 60)
+MAX_WORKERS = 8
+# Linhas por página nas coleções de histórico; 0 volta ao limit=-1 (tudo de uma vez)
+PAGE_SIZE = int(os.getenv("DIRECTUS_PAGE_SIZE", "5000"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    # Uma única Session por processo: o pool do urllib3 é thread-safe e mantém
+    # as conexões keep-alive (e o handshake TLS) entre chamadas e reruns.
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def collection_name(url: str) -> str:
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+# Campo da conta em cada coleção
+ACCOUNT_FIELDS = {
+    "Log__Trading_history": "Account",
+    "log_balance": "account_number",
+    "log__drawdown_tracking": "account_number",
+    "log_estatistica": "account_number",
+    "log_trading": "account_number",
+    "Log__Pnl": "Account_number",
+    "coreops_accounts": "account_number",
+}
+# Tamanho máximo da lista de contas de um filtro _in, para a URL não estourar
+MAX_IN_CHARS = int(os.getenv("DIRECTUS_MAX_IN_CHARS", "1500"))
+
+
+# Campo de data usado pelo filtro de período; None = a coleção não é filtrada
+# (Estatística e coreops_accounts são o estado atual da conta, não histórico)
+TIME_FIELDS = {
+    "Log__Trading_history": "Opentime",
+    "log_estatistica": None,
+    "coreops_accounts": None,
+}
+
+
+# Campos de data de cada coleção que servem de watermark na sincronização
+# incremental (store.WATERMARK_FIELDS); entram em toda projeção, senão edições
+# feitas depois do watermark (date_updated) não são vistas. Ausente = só date_created.
+WATERMARK_FIELDS = {
+    "Log__Trading_history": ("date_updated", "date_created"),
+    "log_balance": ("date_updated", "date_created"),
+    "coreops_accounts": (),
+}
+
+
+def account_field(url: str) -> str | None:
+    return ACCOUNT_FIELDS.get(collection_name(url))
+
+
+def time_field(url: str) -> str | None:
+    return TIME_FIELDS.get(collection_name(url), "date_created")
+
+
+def watermark_fields(url: str) -> tuple:
+    return WATERMARK_FIELDS.get(collection_name(url), ("date_created",))
+
+
+def build_params(url: str, account, fields=None, periodo=None) -> dict:
+    # `account` é uma conta (filtro _eq) ou uma tupla/lista de contas (filtro _in).
+    # `fields` projeta as colunas; `id`, o campo da conta e os campos de watermark
+    # entram sempre (paginação por keyset, separação por conta e store.sync dependem deles).
+    # `periodo` = (início, fim) em ISO, aplicado com _between no campo de time_field(url).
+    campo = account_field(url)
+    if campo is None:
+        return {}
+    if isinstance(account, (list, tuple)):
+        params = {f"filter[{campo}][_in]": ",".join(account), "limit": -1}
+    else:
+        limit = 1 if collection_name(url) == "coreops_accounts" else -1
+        params = {f"filter[{campo}][_eq]": account, "limit": limit}
+    if fields:
+        params["fields"] = ",".join(dict.fromkeys(("id", campo, *fields, *watermark_fields(url))))
+    if periodo and time_field(url):
+        params[f"filter[{time_field(url)}][_between]"] = ",".join(periodo)
+    return params
+
+
+def chunk_accounts(accounts, max_chars: int = MAX_IN_CHARS) -> list:
+    # Divide as contas em blocos cuja lista separada por vírgula cabe em max_chars
+    blocos, atual, tamanho = [], [], 0
+    for account in accounts:
+        if atual and tamanho + len(account) + 1 > max_chars:
+            blocos.append(tuple(atual))
+            atual, tamanho = [], 0
+        atual.append(account)
+        tamanho += len(account) + 1
+    if atual:
+        blocos.append(tuple(atual))
+    return blocos
+
+
+def get_frame(url: str, bearer: str, params: dict, timeout) -> tuple:
+    # (DataFrame de `data`, `meta`) decodificados direto em colunas (decode.py)
+    headers = {"Authorization": f"Bearer {bearer}"}
+    inicio = time.perf_counter()
+    with get_session().get(url=url, headers=headers, params=params, timeout=timeout, stream=True) as response:
+        latencia = time.perf_counter() - inicio
+        response.raise_for_status()
+        inicio = time.perf_counter()
+        try:
+            df, meta, tamanho = decode.decode(response)
+        except decode.DECODE_ERRORS as e:
+            # Como o response.json() de antes: corpo inválido (ex.: página HTML de erro com 200)
+            # vira RequestException e cai no mesmo tratamento de erro de rede
+            raise requests.exceptions.InvalidJSONError(f"resposta inválida de {collection_name(url)}: {e}",
+                                                       response=response) from e
+    metrics.record("http", colecao=collection_name(url), status=response.status_code,
+                   latency_ms=round(latencia * 1000, 3), response_bytes=tamanho,
+                   decode_ms=round((time.perf_counter() - inicio) * 1000, 3),
+                   rows=len(df), decoder=decode.BACKEND)
+    return df, meta
+
+
+def get_json(url: str, bearer: str, params: dict, timeout) -> dict:
+    headers = {"Authorization": f"Bearer {bearer}"}
+    inicio = time.perf_counter()
+    response = get_session().get(url=url, headers=headers, params=params, timeout=timeout)
+    latencia = time.perf_counter() - inicio
+    response.raise_for_status()
+    inicio = time.perf_counter()
+    payload = response.json()
+    metrics.record("http", colecao=collection_name(url), status=response.status_code,
+                   latency_ms=round(latencia * 1000, 3), response_bytes=len(response.content),
+                   decode_ms=round((time.perf_counter() - inicio) * 1000, 3),
+                   rows=len(payload.get("data") or []))
+    return payload
+
+
+def iter_pages(url: str, bearer: str, account: str, page_size: int = PAGE_SIZE,
+               timeout=DEFAULT_TIMEOUT, on_progress=None, extra_params: dict | None = None, fields=None,
+               periodo=None):
+    """Percorre a coleção em páginas de `page_size` linhas, um DataFrame por página.
+
+    Usa keyset em `id` (filter[id][_gt]) para não degradar em páginas profundas;
+    se a coleção não devolver `id`, cai para offset. `on_progress(carregadas, total)`
+    é chamado após cada página (`total` vem de meta=filter_count e pode ser None).
+    `extra_params` é somado aos filtros da conta (ex.: filtros de data).
+    """
+    base = {**build_params(url, account, fields, periodo), **(extra_params or {}), "limit": page_size, "sort": "id"}
+    cursor = {"meta": "filter_count"}
+    carregadas = 0
+    total = None
+    while True:
+        chunk, meta = get_frame(url, bearer, {**base, **cursor}, timeout)
+        if total is None:
+            total = meta.get("filter_count")
+        if chunk.empty:
+            break
+        carregadas += len(chunk)
+        if on_progress is not None:
+            on_progress(carregadas, total)
+        yield chunk
+        if len(chunk) < page_size:
+            break
+        if "id" in chunk.columns:
+            cursor = {"filter[id][_gt]": chunk["id"].iloc[-1]}
+        else:
+            cursor = {"offset": carregadas}
+
+
+def fetch(url: str, bearer: str, account: str, timeout=DEFAULT_TIMEOUT, page_size: int = PAGE_SIZE,
+          on_progress=None, extra_params: dict | None = None, fields=None, periodo=None) -> pd.DataFrame:
+    # Levanta requests.RequestException em caso de erro; quem chama decide como exibir.
+    # `fields=None` baixa todas as colunas; `periodo=None`, o histórico inteiro.
+    with metrics.timer("fetch", colecao=collection_name(url), projetado=bool(fields),
+                       periodo=",".join(periodo) if periodo else None) as extra:
+        try:
+            df = _fetch(url, bearer, account, timeout, page_size, on_progress, extra_params, fields, periodo)
+        except requests.HTTPError as e:
+            # O Directus recusa (400/403) campos que a coleção não tem neste ambiente:
+            # cai para o fetch completo em vez de deixar a aba vazia
+            if not fields or e.response is None or e.response.status_code not in (400, 403):
+                raise
+            df = _fetch(url, bearer, account, timeout, page_size, on_progress, extra_params, None, periodo)
+        extra.update(rows=len(df), memory_bytes=int(df.memory_usage(deep=True).sum()))
+    return df
+
+
+def _fetch(url, bearer, account, timeout, page_size, on_progress, extra_params, fields, periodo) -> pd.DataFrame:
+    params = build_params(url, account, fields, periodo)
+    if not page_size or params.get("limit") != -1:
+        df, _ = get_frame(url, bearer, {**params, **(extra_params or {})}, timeout)
+        return df
+
+    # Só páginas já convertidas ficam em memória, nunca a resposta inteira como lista de dicts
+    chunks = list(iter_pages(url, bearer, account, page_size, timeout, on_progress, extra_params, fields,
+                             periodo))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True, copy=False)
+
+
+def fetch_all(urls: dict, bearer: str, account: str, timeout=DEFAULT_TIMEOUT, on_progress=None,
+              fetcher=None, fields: dict | None = None, periodo=None) -> tuple:
+    """Busca várias coleções em paralelo.
+
+    `urls` mapeia nome -> URL. Retorna (frames, erros): um DataFrame por nome
+    (vazio quando a chamada falha) e a mensagem de erro de cada chamada que falhou.
+    `on_progress(progresso)` recebe {nome: (carregadas, total)} e é sempre chamado
+    na thread de quem chamou fetch_all, então pode atualizar widgets do Streamlit.
+    `fetcher` substitui `fetch` (mesma assinatura), ex.: store.sync.
+    `fields` mapeia nome -> colunas a baixar (ausente = todas); `periodo` vale para todas.
+    """
+    fields = fields or {}
+    fetcher = fetcher or fetch
+    frames = {}
+    erros = {}
+    progresso = {nome: (0, None) for nome in urls}
+
+    def _fetch(nome, url):
+        def _progress(carregadas, total):
+            progresso[nome] = (carregadas, total)
+        return fetcher(url, bearer, account, timeout, on_progress=_progress, fields=fields.get(nome),
+                       periodo=periodo)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, max(len(urls), 1))) as pool:
+        futures = {pool.submit(_fetch, nome, url): nome for nome, url in urls.items()}
+        pendentes = set(futures)
+        while pendentes:
+            _, pendentes = wait(pendentes, timeout=0.25)
+            if on_progress is not None:
+                on_progress(dict(progresso))
+        for future, nome in futures.items():
+            try:
+                frames[nome] = future.result()
+            except requests.RequestException as e:
+                frames[nome] = pd.DataFrame()
+                erros[nome] = str(e)
+    return frames, erros
+
+
+def fetch_batch(url: str, bearer: str, accounts, timeout=DEFAULT_TIMEOUT, on_progress=None,
+                fields=None, periodo=None) -> pd.DataFrame:
+    """Uma coleção para várias contas com filter[...][_in], em blocos que cabem na URL.
+
+    Mesma assinatura de `fetch` (serve de `fetcher` para fetch_all); o resultado
+    vem num único frame, a separar por conta com groupby no campo de account_field(url).
+    """
+    carregadas_antes = 0
+    chunks = []
+    for bloco in chunk_accounts(accounts):
+        def _progress(carregadas, total, _base=carregadas_antes):
+            if on_progress is not None:
+                on_progress(_base + carregadas, None)
+        df = fetch(url, bearer, bloco, timeout, on_progress=_progress, fields=fields, periodo=periodo)
+        carregadas_antes += len(df)
+        chunks.append(df)
+    chunks = [c for c in chunks if not c.empty]
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True, copy=False)
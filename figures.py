@@ -0,0 +1,190 @@
+"""Cache de figuras Plotly entre reruns e sessões, e os construtores de figura
+que não dependem do Streamlit (usados também pelo report.py).
+
+Cada figura é guardada já construída pela chave (gráfico, fingerprint dos
+dados); o que conta no limite de memória é o tamanho dos arrays das traces
+(`figure_bytes`), sem serializar a figura só para medi-la. Como vive no
+nível do módulo, todas as sessões do processo compartilham as figuras: não
+altere uma figura devolvida daqui.
+"""
+import dataclasses
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import analytics
+import cache
+import charts
+
+FIGURE_CACHE_MB = float(os.getenv("FIGURE_CACHE_MB", "64"))
+
+figuras = cache.FrameCache(max_bytes=int(FIGURE_CACHE_MB * 1024 * 1024))
+
+
+def fingerprint(*objs) -> tuple:
+    """Chave barata para os dados de uma figura: frames, resumos, arrays ou escalares."""
+    partes = []
+    for obj in objs:
+        if isinstance(obj, pd.DataFrame):
+            # Frames pequenos (resumos) entram inteiros no hash; os grandes pelo fingerprint
+            if len(obj) <= 10000:
+                partes.append((tuple(obj.columns), int(pd.util.hash_pandas_object(obj, index=False).sum())))
+            else:
+                partes.append(analytics.fingerprint(obj))
+        elif dataclasses.is_dataclass(obj):
+            partes.append(fingerprint(*vars(obj).values()))
+        elif isinstance(obj, dict):
+            partes.append(tuple((k, fingerprint(v)) for k, v in obj.items()))
+        elif isinstance(obj, (tuple, list)):
+            partes.append(fingerprint(*obj))
+        elif isinstance(obj, np.ndarray):
+            partes.append(hash(obj.tobytes()))
+        else:
+            partes.append(str(obj))
+    return tuple(partes)
+
+
+def figure_bytes(fig: go.Figure) -> int:
+    # Estimativa: bytes dos arrays de dados de cada trace (o layout é pequeno)
+    total = 0
+    for trace in fig.data:
+        for valor in trace.to_plotly_json().values():
+            if isinstance(valor, (np.ndarray, pd.Series, pd.Index, list, tuple)):
+                total += np.asarray(valor).nbytes
+    return total
+
+
+def get_or_build(chart: str, chave, construir) -> tuple:
+    """(figura, bytes estimados, veio do cache) para `chart` com dados `chave`."""
+    key = (chart, chave)
+    entry = figuras.get(key)
+    if entry is not None:
+        return entry["fig"], entry["bytes"], True
+    fig = construir()
+    tamanho = figure_bytes(fig)
+    figuras.put(key, {"fig": fig, "bytes": tamanho}, tamanho)
+    return fig, tamanho, False
+
+
+def indicadores(cards: list, colunas: int = 3, altura_linha: int = 160) -> go.Figure:
+    """Uma figura com vários go.Indicator em grade, no lugar de uma figura por card."""
+    linhas = max(1, -(-len(cards) // colunas))
+    fig = go.Figure()
+    for i, (titulo, valor) in enumerate(cards):
+        linha, coluna = divmod(i, colunas)
+        fig.add_trace(go.Indicator(
+            mode="number",
+            value=valor,
+            number={"font": {"size": 36}},
+            title={"text": f"<b>{titulo}</b>", "font": {"size": 16}},
+            domain={"row": linha, "column": coluna},
+        ))
+    fig.update_layout(
+        grid={"rows": linhas, "columns": colunas, "pattern": "independent"},
+        height=altura_linha * linhas,
+        margin=dict(t=20, b=10, l=10, r=10),
+        template="simple_white"
+    )
+    return fig
+
+
+def indicador_card(titulo, valor):
+    fig = go.Figure(go.Indicator(
+        mode="number",
+        value=valor,
+        number={"font": {"size": 36}},
+        title={"text": f"<b>{titulo}</b>", "font": {"size": 16}}
+    ))
+    fig.update_layout(
+        height=160,
+        margin=dict(t=20, b=10, l=10, r=10),
+        template="simple_white"
+    )
+    return fig
+
+
+def histograma(contagens, bordas, title: str, label: str):
+    # Histograma a partir de bins já calculados (analytics.TradingSummary.histograms)
+    fig = go.Figure(go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas)))
+    fig.update_layout(title=title, xaxis_title=label, yaxis_title='Frequência', bargap=0)
+    return fig
+
+
+def pnl_cumulativo(df_trading: pd.DataFrame) -> go.Figure:
+    df_pnl_time = df_trading.sort_values('date_created')
+    fig = go.Figure(charts.series(df_pnl_time['date_created'], df_pnl_time['cumulative_pnl'],
+                                  name='P&L Cumulativo', mode='lines'))
+    fig.update_layout(title='P&L Cumulativo ao Longo do Tempo (em pontos)',
+                      xaxis_title='Data', yaxis_title='P&L Cumulativo')
+    return fig
+
+
+def drawdown(df_draw: pd.DataFrame) -> go.Figure:
+    # Séries reduzidas à resolução da tela (LTTB) e em WebGL quando longas
+    fig = go.Figure()
+
+    fig.add_trace(charts.series(
+        df_draw['date_created'],
+        df_draw['dd_max'],
+        name='DD Máximo',
+        mode='lines',
+        line=dict(width=2.5, color='#EF553B', dash='dot'),
+        line_shape='spline'
+    ))
+
+    fig.add_trace(charts.series(
+        df_draw['date_created'],
+        df_draw['hwm'],
+        name='HWM',
+        mode='lines',
+        line=dict(width=2.5, color='#00CC96'),
+        line_shape='spline'
+    ))
+
+    fig.add_trace(charts.series(
+        df_draw['date_created'],
+        df_draw['saldo_atual'],
+        name='Saldo Atual',
+        mode='lines',
+        line=dict(width=2.5, color='#636EFA'),
+        line_shape='spline'
+    ))
+
+    fig.add_trace(charts.series(
+        df_draw['date_created'],
+        df_draw['saldo_flt'],
+        name='Saldo Flutuante',
+        mode='lines+markers',
+        marker=dict(size=4),
+        line=dict(width=2.5, color='#AB63FA'),
+        line_shape='spline'
+    ))
+
+    if 'balance' in df_draw.columns:
+        fig.add_trace(charts.series(
+            df_draw['date_created'],
+            df_draw['balance'],
+            name='Balance',
+            mode='lines',
+            line=dict(width=1.5, color='#FFA15A'),
+            line_shape='hv'
+        ))
+
+    fig.update_layout(
+        template='plotly_dark',
+        margin=dict(l=20, r=20, t=30, b=30),
+        hovermode='x unified',
+        legend=dict(
+            orientation='h',
+            yanchor='top',
+            y=1.1,
+            xanchor='right',
+            x=1,
+            font=dict(size=12)
+        ),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, zeroline=False)
+    )
+    return fig
@@ -1,17 +1,13 @@
 # login.py
 import streamlit as st
-from dotenv import load_dotenv
-import os
 
-# Para validar a senha sempre carregamos o .env.blueberry (mesma SENHA nos 3 .env)
-load_dotenv(dotenv_path=".env.blueberry", override=False)
+import preload
 
 def login_screen():
     st.title("Login")
     st.write("Digite a sua senha para entrar:")
     pwd = st.text_input("", type="password", placeholder="••••••••")
     if st.button("Entrar"):
-        # if pwd == os.getenv("SENHA"):
         if pwd == 'SENHA' :
             st.info("Senha correta, pressione novamente o 'Entrar'")
             st.session_state.logged_in = True
@@ -27,6 +23,8 @@ def main():
         import collection
         collection.main()
     else:
+        # Enquanto a senha é digitada, o dashboard (pandas, Plotly...) carrega em segundo plano
+        preload.start()
         login_screen()
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Log estruturado (uma linha JSON por evento) e buffer recente para o painel de debug
+LOG_PATH = os.getenv("METRICS_LOG", ".metrics/timings.jsonl")
+BUFFER_SIZE = 1000
+
+_recentes = deque(maxlen=BUFFER_SIZE)
+_lock = threading.Lock()
+_marca = threading.local()
+
+
+def record(evento: str, **campos):
+    """Registra um evento (`http`, `fetch`, `normalize`, `figure`...) com seus campos.
+
+    Tempos em milissegundos (`*_ms`), tamanhos em bytes (`*_bytes`).
+    Falha ao gravar o log nunca interrompe o dashboard.
+    """
+    linha = {"ts": time.time(), "evento": evento, "thread": threading.current_thread().name, **campos}
+    with _lock:
+        _recentes.append(linha)
+        try:
+            os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(linha, default=str) + "\n")
+        except OSError:
+            pass
+
+
+@contextmanager
+def timer(evento: str, **campos):
+    # Mede o bloco e grava `ms`; o dict devolvido aceita campos extras (linhas, bytes...)
+    extra = {}
+    inicio = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        record(evento, ms=round((time.perf_counter() - inicio) * 1000, 3), **campos, **extra)
+
+
+def since(ts: float) -> list:
+    # Eventos registrados a partir de `ts` (time.time()), do mais antigo ao mais novo
+    with _lock:
+        return [linha for linha in _recentes if linha["ts"] >= ts]
+
+
+def mark():
+    # Marca o início da construção do próximo gráfico (por thread)
+    _marca.t = time.perf_counter()
+
+
+def since_mark_ms() -> float | None:
+    t = getattr(_marca, "t", None)
+    return None if t is None else round((time.perf_counter() - t) * 1000, 3)
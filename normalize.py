@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# Tipos declarados por coleção (nome final da URL). Colunas ausentes são ignoradas.
+# float32 só onde a precisão basta (valores inteiros: duração em segundos, ticks);
+# preços, saldos e lotes (fracionários e somados nos totais) ficam em float64.
+SCHEMAS = {
+    "Log__Trading_history": {
+        "datetime": ["date_created", "date_updated", "Opentime", "Closetime"],
+        "float64": ["Openprice", "Closeprice", "Initial_Balance", "Lots"],
+        "float32": ["Duration", "Ticks"],
+        "category": ["Asset", "Side", "Type", "Account_status"],
+    },
+    "log_balance": {
+        "datetime": ["date_created", "date_updated"],
+        "float64": ["balance"],
+        "sort": "date_created",
+    },
+    "log__drawdown_tracking": {
+        "datetime": ["date_created", "date_updated"],
+        "float64": ["dd_restante", "saldo_atual", "saldo_flt", "dd_max", "perda_max", "max_conta", "hwm"],
+        "sort": "date_created",
+    },
+}
+DEFAULT_SCHEMA = {
+    "datetime": ["date_created", "date_updated", "created_at", "data_ref"],
+}
+
+
+def _trading_history(df: pd.DataFrame) -> pd.DataFrame:
+    # Colunas derivadas, todas vetorizadas
+    if {"Openprice", "Closeprice", "Side"}.issubset(df.columns):
+        diff = (df["Closeprice"] - df["Openprice"]).to_numpy()
+        side = df["Side"].astype(object).to_numpy()
+        df["PnL_points"] = np.select([side == "BUY", side == "SELL"], [diff, -diff], default=0.0)
+
+        if "date_created" in df.columns:
+            # Acumulado na ordem cronológica, devolvido ao índice original
+            ordem = np.argsort(df["date_created"].to_numpy(), kind="stable")
+            acumulado = np.empty(len(df))
+            acumulado[ordem] = np.nancumsum(df["PnL_points"].to_numpy()[ordem])
+            df["cumulative_pnl"] = acumulado
+
+    if "Opentime" in df.columns:
+        df["hour"] = df["Opentime"].dt.hour
+    return df
+
+
+DERIVED = {
+    "Log__Trading_history": _trading_history,
+}
+
+
+def normalize(colecao: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica o schema declarado e as colunas derivadas de `colecao`.
+
+    Roda uma vez por coleção baixada (antes de ir para o cache); os gráficos
+    recebem o frame já tipado e não devem convertê-lo de novo.
+    """
+    if df.empty:
+        return df
+    schema = SCHEMAS.get(colecao, DEFAULT_SCHEMA)
+    df = df.copy()
+
+    for col in schema.get("datetime", []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for dtype in ("float64", "float32"):
+        cols = [c for c in schema.get(dtype, []) if c in df.columns]
+        if cols:
+            df[cols] = df[cols].apply(pd.to_numeric, errors="coerce").astype(dtype)
+    for col in schema.get("category", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    if schema.get("sort") in df.columns:
+        df = df.sort_values(schema["sort"], kind="stable", ignore_index=True)
+
+    derived = DERIVED.get(colecao)
+    if derived is not None:
+        df = derived(df)
+    return df
@@ -0,0 +1,41 @@
+"""Importa os módulos pesados do dashboard em segundo plano.
+
+login.py chama `start()` enquanto mostra a tela de login: pandas, Plotly e o
+próprio collection carregam numa thread, e o `import collection` depois do
+login encontra tudo pronto. Só usa a biblioteca padrão, para não pesar na
+tela de login.
+"""
+import importlib
+import threading
+import time
+
+# Na ordem de importação; collection puxa pandas, requests e o resto do dashboard
+MODULES = ("collection", "plotly.express")
+
+_lock = threading.Lock()
+_thread = None
+tempos = {}  # módulo -> ms gastos no import em segundo plano
+
+
+def _importa():
+    for nome in MODULES:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(nome)
+        except Exception:
+            # O import de verdade, depois do login, mostra o erro
+            continue
+        tempos[nome] = round((time.perf_counter() - inicio) * 1000, 3)
+
+
+def start():
+    """Dispara o aquecimento uma vez por processo; chamadas seguintes não fazem nada."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_importa, name="preload", daemon=True)
+            _thread.start()
+
+
+def done() -> bool:
+    return _thread is not None and not _thread.is_alive()
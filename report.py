@@ -0,0 +1,227 @@
+"""Relatórios em lote, sem Streamlit: um relatório HTML (e Parquet) por conta.
+
+Busca as coleções de cada conta com um pool de threads (I/O, mesma sessão e
+projeções do dashboard) e, conforme cada conta chega, manda o trabalho de
+pandas/Plotly (normalização, resumo, séries de drawdown, figuras) para um pool
+de processos, um por núcleo. No fim grava uma tabela de resumo com as
+métricas-chave de todas as contas:
+
+    python -m report --env blueberry --status active
+    python -m report --env p4f --all --days 30 --processes 8 --out /srv/relatorios
+
+Saída em `<out>/<conta>/report.html` (+ `<coleção>.parquet` com pyarrow) e
+`<out>/summary.csv` / `summary.html`.
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import plotly.express as px
+
+import analytics
+import config
+import directus
+import figures
+import normalize
+import snapshot
+import timeseries
+import warmer
+
+
+def fetch_account(cfg: config.EnvConfig, urls: dict, account: str, periodo=None, timeout=directus.DEFAULT_TIMEOUT) -> tuple:
+    """(nome -> frame cru, [erros]) de uma conta; uma coleção por vez, o paralelismo é entre contas.
+
+    Mesmo caminho do dashboard (cache.fetch_all): directus.fetch com as projeções
+    de config.CAMPOS; a normalização fica para o processo do relatório.
+    """
+    brutos, erros = {}, []
+    for nome, url in urls.items():
+        try:
+            brutos[nome] = directus.fetch(url, cfg.bearer, account, timeout, fields=config.CAMPOS.get(nome),
+                                          periodo=periodo)
+        except Exception as e:
+            # Qualquer falha fica só nesta coleção desta conta; a rodada continua
+            erros.append(f"{nome}: {e}")
+    return brutos, erros
+
+
+def _cards(df: pd.DataFrame) -> list:
+    # Campos numéricos da primeira linha de log_estatistica, como na aba Estatística
+    cards = []
+    for key, value in ({} if df.empty else df.iloc[0].to_dict()).items():
+        try:
+            cards.append((key, float(value)))
+        except (TypeError, ValueError):
+            continue
+    return cards
+
+
+def _figuras_trading(resumo: analytics.TradingSummary, df: pd.DataFrame) -> list:
+    figs = []
+    if not resumo.asset.empty:
+        fig = px.pie(resumo.asset, names='Asset', values='count', title='Distribuição por Ativo')
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        figs.append(fig)
+    if not resumo.side.empty:
+        figs.append(px.bar(resumo.side.rename(columns={'count': 'Count'}), x='Side', y='Count',
+                           color='Side', text='Count', title='Quantidade de Operações por Direção'))
+    if 'cumulative_pnl' in df.columns and 'date_created' in df.columns:
+        figs.append(figures.pnl_cumulativo(df))
+    titulos = {
+        'Openprice': ('Distribuição de Preços de Abertura', 'Preço de Abertura'),
+        'Duration': ('Distribuição da Duração das Operações', 'Duração'),
+        'Lots': ('Distribuição de Tamanho das Operações', 'Lotes'),
+        'Ticks': ('Distribuição de Ticks das Operações', 'Ticks'),
+    }
+    for col, (titulo, label) in titulos.items():
+        if col in resumo.histograms:
+            figs.append(figures.histograma(*resumo.histograms[col], title=titulo, label=label))
+    if not resumo.hour.empty:
+        figs.append(px.bar(resumo.hour, x='hour', y='count', title='Operações por Hora do Dia',
+                           labels={'hour': 'Hora', 'count': 'Quantidade'}))
+    return figs
+
+
+def _html(env: str, account: str, secoes: list) -> str:
+    # plotly.js só na primeira figura (CDN); as demais reaproveitam
+    partes = [f"<html><head><meta charset='utf-8'><title>{html.escape(account)} ({env})</title></head><body>",
+              f"<h1>Conta {html.escape(account)} ({env})</h1>",
+              f"<p>Gerado em {datetime.now(timezone.utc):%Y-%m-%d %H:%M UTC}</p>"]
+    primeira = True
+    for titulo, figs in secoes:
+        partes.append(f"<h2>{html.escape(titulo)}</h2>")
+        for fig in figs:
+            partes.append(fig.to_html(full_html=False, include_plotlyjs="cdn" if primeira else False))
+            primeira = False
+    partes.append("</body></html>")
+    return "\n".join(partes)
+
+
+def build_report(env: str, account: str, brutos: dict, urls: dict, saida: str, parquet: bool = True) -> dict:
+    """Roda num processo do pool: normaliza, resume, grava o relatório e devolve a linha do resumo."""
+    if not snapshot.valid_name(account):
+        raise ValueError(f"conta inválida: {account!r}")
+    inicio = time.perf_counter()
+    frames = {nome: normalize.normalize(directus.collection_name(urls[nome]), df) for nome, df in brutos.items()}
+    pasta = os.path.join(saida, account)
+    os.makedirs(pasta, exist_ok=True)
+
+    secoes = []
+    trading = frames.get("Trading History", pd.DataFrame())
+    if not trading.empty:
+        secoes.append(("Trading History", _figuras_trading(analytics.compute_trading_summary(trading), trading)))
+    draw = frames.get("Drawdown Tracking", pd.DataFrame())
+    if not draw.empty and "date_created" in draw.columns:
+        bruto, niveis = timeseries.drawdown_series(draw, frames.get("Balance", pd.DataFrame()))
+        if not bruto.empty:
+            _, df_draw = timeseries.pick_resolution(bruto, niveis, bruto["date_created"].min(),
+                                                    bruto["date_created"].max())
+            secoes.append(("Drawdown Tracking", [figures.drawdown(df_draw)]))
+    cards = _cards(frames.get("Estatística", pd.DataFrame()))
+    if cards:
+        secoes.append(("Estatística", [figures.indicadores(cards, colunas=3)]))
+    with open(os.path.join(pasta, "report.html"), "w", encoding="utf-8") as f:
+        f.write(_html(env, account, secoes))
+
+    if parquet and snapshot.AVAILABLE:
+        for nome, df in frames.items():
+            arquivo = re.sub(r"[^a-z0-9]+", "_", nome.lower()).strip("_") + ".parquet"
+            snapshot.arrow_safe(df).to_parquet(os.path.join(pasta, arquivo), index=False)
+
+    comparacao = analytics.compare_accounts(frames, urls)
+    linha = comparacao.loc[account].to_dict() if account in comparacao.index else {}
+    linhas = {f"Linhas {nome}": len(df) for nome, df in frames.items()}
+    return {"Conta": account, **linha, **linhas, "Tempo (s)": round(time.perf_counter() - inicio, 2)}
+
+
+def run(env: str, contas: list, saida: str, periodo=None, processes: int | None = None,
+        io_workers: int = directus.MAX_WORKERS, parquet: bool = True) -> pd.DataFrame:
+    cfg = config.get(env)
+    urls = {nome: url for nome, url in cfg.urls.items() if url}
+    os.makedirs(saida, exist_ok=True)
+    linhas, erros = [], {}
+
+    # spawn: os processos não herdam por fork o estado das threads de I/O (locks, sessão HTTP)
+    with ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="report-io") as io, \
+            ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as cpu:
+        # A conta vira nome de pasta em `saida`: mesma regra dos snapshots
+        for conta in contas:
+            if not snapshot.valid_name(conta):
+                erros[conta] = ["conta inválida (só letras, números, _ e -)"]
+                print(f"[{env}] {conta}: {erros[conta][0]}", flush=True)
+        buscas = {io.submit(fetch_account, cfg, urls, conta, periodo): conta
+                  for conta in dict.fromkeys(contas) if conta not in erros}
+        relatorios = {}
+        pendentes = set(buscas)
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                if futuro in buscas:
+                    conta = buscas.pop(futuro)
+                    try:
+                        brutos, erros[conta] = futuro.result()
+                    except Exception as e:
+                        erros[conta] = [f"busca: {e}"]
+                        print(f"[{env}] {conta}: {erros[conta][0]}", flush=True)
+                        continue
+                    relatorio = cpu.submit(build_report, env, conta, brutos, urls, saida, parquet)
+                    relatorios[relatorio] = conta
+                    pendentes.add(relatorio)
+                else:
+                    conta = relatorios.pop(futuro)
+                    try:
+                        linhas.append(futuro.result())
+                    except Exception as e:
+                        erros[conta].append(f"relatório: {e}")
+                    print(f"[{env}] {conta}: {'; '.join(erros[conta]) or 'ok'}", flush=True)
+
+    # Todas as contas entram no resumo, inclusive as que falharam (só com a coluna Erros)
+    resumo = pd.DataFrame(linhas)
+    resumo = (resumo.set_index("Conta") if not resumo.empty else pd.DataFrame()).reindex(list(dict.fromkeys(contas)))
+    resumo.index.name = "Conta"
+    resumo["Erros"] = pd.Series({c: "; ".join(e) for c, e in erros.items() if e}, dtype=object)
+    resumo.to_csv(os.path.join(saida, "summary.csv"))
+    with open(os.path.join(saida, "summary.html"), "w", encoding="utf-8") as f:
+        f.write(f"<html><head><meta charset='utf-8'><title>Resumo {env}</title></head><body>"
+                f"<h1>Resumo {env}</h1>{resumo.to_html(na_rep='', float_format='{:.2f}'.format)}</body></html>")
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--env", choices=config.ENVS, required=True)
+    parser.add_argument("--accounts-file", help="arquivo com uma conta por linha")
+    parser.add_argument("--status", nargs="*", default=None, help="status de coreops_accounts (ex.: active)")
+    parser.add_argument("--all", action="store_true", help="todas as contas de coreops_accounts")
+    parser.add_argument("--days", type=int, help="só os últimos N dias (padrão: histórico inteiro)")
+    parser.add_argument("--out", help="pasta de saída (padrão: reports/<env>/<data>)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="processos para o pandas")
+    parser.add_argument("--io-workers", type=int, default=directus.MAX_WORKERS, help="contas buscadas ao mesmo tempo")
+    parser.add_argument("--no-parquet", action="store_true", help="não grava os frames em Parquet")
+    args = parser.parse_args()
+    if not (args.accounts_file or args.status or args.all):
+        parser.error("informe --accounts-file, --status e/ou --all")
+
+    cfg = config.get(args.env)
+    contas = warmer.watchlist(cfg, args.accounts_file, args.status)
+    if args.all:
+        contas = list(dict.fromkeys(contas + warmer.accounts_from_coreops(cfg, None)))
+    periodo = None
+    if args.days:
+        fim = datetime.now(timezone.utc)
+        periodo = ((fim - timedelta(days=args.days)).strftime("%Y-%m-%dT%H:%M:%S"), fim.strftime("%Y-%m-%dT%H:%M:%S"))
+    saida = args.out or os.path.join("reports", args.env, datetime.now(timezone.utc).strftime("%Y%m%d"))
+
+    inicio = time.perf_counter()
+    resumo = run(args.env, contas, saida, periodo, args.processes, args.io_workers, not args.no_parquet)
+    print(f"[{args.env}] {len(resumo)} contas em {time.perf_counter() - inicio:.1f}s -> {saida}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
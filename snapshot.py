@@ -0,0 +1,127 @@
+"""Snapshots de conta em arquivos Arrow, para reabrir sem a API.
+
+Cada snapshot é uma pasta `<SNAPSHOT_DIR>/<env>/<conta>/<data>/` com um arquivo
+Arrow IPC (Feather v2, sem compressão) por coleção, já normalizado e tipado,
+e um `manifest.json` (env, conta, watermark por coleção, horário do fetch).
+Sem compressão o arquivo pode ser lido por memory map: as colunas numéricas
+viram DataFrame sem cópia e só as páginas usadas saem do disco.
+
+Depende de pyarrow (opcional): sem ele, `AVAILABLE` é False e a UI esconde a opção.
+"""
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import store
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+AVAILABLE = pa is not None
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", ".snapshots")
+MANIFEST = "manifest.json"
+# env e conta viram nomes de pasta: nada de "..", "/" ou caminho absoluto
+NOME_VALIDO = re.compile(r"^[0-9A-Za-z_-]+$")
+
+
+def valid_name(nome: str) -> bool:
+    return bool(nome) and NOME_VALIDO.match(nome) is not None
+
+
+def _arquivo(nome: str) -> str:
+    # Nome da aba -> nome de arquivo seguro ("Drawdown Tracking" -> drawdown_tracking.arrow)
+    return re.sub(r"[^a-z0-9]+", "_", nome.lower()).strip("_") + ".arrow"
+
+
+def _watermark(df: pd.DataFrame) -> str | None:
+    campos = [c for c in store.WATERMARK_FIELDS if c in df.columns and df[c].notna().any()]
+    return max((str(df[c].max()) for c in campos), default=None)
+
+
+def arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    convertidas = {}
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            convertidas[col] = df[col].map(lambda v: v if v is None else json.dumps(v, default=str))
+    return df.assign(**convertidas) if convertidas else df
+
+
+def save(env: str, account: str, frames: dict, urls: dict, fetched_at: datetime | None = None) -> str:
+    """Grava `frames` (nome -> DataFrame normalizado) e devolve a pasta do snapshot."""
+    if not AVAILABLE:
+        raise RuntimeError("pyarrow não instalado: snapshots indisponíveis")
+    if not (valid_name(env) and valid_name(account)):
+        raise ValueError(f"env/conta inválidos para snapshot: {env!r}/{account!r}")
+    fetched_at = fetched_at or datetime.now(timezone.utc)
+    pasta = os.path.join(SNAPSHOT_DIR, env, account, fetched_at.strftime("%Y%m%dT%H%M%S"))
+    os.makedirs(pasta, exist_ok=True)
+
+    colecoes = {}
+    for nome, df in frames.items():
+        arquivo = _arquivo(nome)
+        caminho = os.path.join(pasta, arquivo)
+        # object com tipos misturados (JSON do Directus) não vira coluna Arrow: vai como texto
+        tabela = pa.Table.from_pandas(arrow_safe(df), preserve_index=False)
+        feather.write_feather(tabela, caminho, compression="uncompressed")
+        colecoes[nome] = {
+            "file": arquivo,
+            "url": urls.get(nome),
+            "rows": len(df),
+            "bytes": os.path.getsize(caminho),
+            "watermark": _watermark(df),
+        }
+
+    dados = {
+        "env": env,
+        "account": account,
+        "fetched_at": fetched_at.isoformat(timespec="seconds"),
+        "watermark": max((c["watermark"] for c in colecoes.values() if c["watermark"]), default=None),
+        "collections": colecoes,
+    }
+    with open(os.path.join(pasta, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    return pasta
+
+
+def manifest(pasta: str) -> dict:
+    with open(os.path.join(pasta, MANIFEST), encoding="utf-8") as f:
+        return {**json.load(f), "path": pasta}
+
+
+def list_snapshots(env: str | None = None, account: str | None = None) -> list:
+    """Manifests disponíveis (mais recentes primeiro), filtrados por env/conta."""
+    if (env is not None and not valid_name(env)) or (account is not None and not valid_name(account)):
+        return []
+    encontrados = []
+    raiz = SNAPSHOT_DIR
+    for env_dir in sorted(os.listdir(raiz)) if os.path.isdir(raiz) else []:
+        if env is not None and env_dir != env:
+            continue
+        for conta in sorted(os.listdir(os.path.join(raiz, env_dir))):
+            if account is not None and conta != account:
+                continue
+            base = os.path.join(raiz, env_dir, conta)
+            for nome in os.listdir(base):
+                if os.path.exists(os.path.join(base, nome, MANIFEST)):
+                    encontrados.append(manifest(os.path.join(base, nome)))
+    return sorted(encontrados, key=lambda m: m["fetched_at"], reverse=True)
+
+
+def load(pasta: str) -> dict:
+    """nome -> DataFrame lido por memory map (sem cópia onde o tipo permite)."""
+    if not AVAILABLE:
+        raise RuntimeError("pyarrow não instalado: snapshots indisponíveis")
+    frames = {}
+    for nome, info in manifest(pasta)["collections"].items():
+        # Só arquivos da própria pasta, mesmo que o manifest tenha sido editado
+        tabela = feather.read_table(os.path.join(pasta, os.path.basename(info["file"])), memory_map=True)
+        frames[nome] = tabela.to_pandas(split_blocks=True)
+    return frames
@@ -0,0 +1,248 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import directus
+
+# Banco local com as linhas já baixadas de cada conta/coleção
+STORE_PATH = os.getenv("STORE_PATH", ".store/directus.sqlite")
+WATERMARK_FIELDS = ("date_updated", "date_created")
+
+_write_lock = threading.Lock()
+
+
+@contextmanager
+def _connect():
+    # Uma conexão por operação (as threads do fetch_all não compartilham conexão);
+    # commit ao sair do bloco e fecha sempre.
+    os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH, timeout=30)
+    try:
+        with conn:
+            _init(conn)
+            yield conn
+    finally:
+        conn.close()
+
+
+def _init(conn: sqlite3.Connection):
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='linhas'").fetchone():
+        # Formato antigo (uma linha = payload JSON): descarta e ressincroniza do zero
+        conn.execute("DROP TABLE linhas")
+        conn.execute("DROP TABLE IF EXISTS watermarks")
+        conn.execute("DROP TABLE IF EXISTS sincronizacoes")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS watermarks ("
+        " env TEXT, colecao TEXT, account TEXT, watermark TEXT, campos TEXT,"
+        " PRIMARY KEY (env, colecao, account))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS sincronizacoes ("
+        " env TEXT, colecao TEXT, account TEXT, synced_at REAL,"
+        " PRIMARY KEY (env, colecao, account))"
+    )
+
+
+def colecao(url: str, fields=None) -> str:
+    # Cada projeção é guardada à parte: linhas com colunas diferentes não se misturam
+    nome = directus.collection_name(url)
+    return f"{nome}[{','.join(fields)}]" if fields else nome
+
+
+def _quote(nome: str) -> str:
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _tabela(nome: str) -> str:
+    # Uma tabela por coleção/projeção, com uma coluna por campo da coleção
+    return "linhas_" + hashlib.sha1(nome.encode()).hexdigest()[:16]
+
+
+def _existe(conn: sqlite3.Connection, tabela: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tabela,)).fetchone() is not None
+
+
+def _prepara(conn: sqlite3.Connection, tabela: str, colunas) -> None:
+    # Colunas sem tipo declarado: o SQLite guarda cada valor como veio (inteiro, real,
+    # texto ou NULL), e ORDER BY id ordena ids numéricos como números
+    if not _existe(conn, tabela):
+        conn.execute(f"CREATE TABLE {_quote(tabela)} (_env, _account, id, PRIMARY KEY (_env, _account, id))")
+    existentes = {linha[1] for linha in conn.execute(f"PRAGMA table_info({_quote(tabela)})")}
+    for coluna in colunas:
+        if coluna not in existentes:
+            conn.execute(f"ALTER TABLE {_quote(tabela)} ADD COLUMN {_quote(coluna)}")
+
+
+def _valor(v):
+    # Listas/objetos do JSON não têm tipo no SQLite: vão como texto JSON
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, default=str)
+    if isinstance(v, (str, bytes)):
+        return v
+    if pd.isna(v):
+        return None
+    return v if isinstance(v, (int, float)) else str(v)
+
+
+def get_watermark(env: str, url: str, account: str, fields=None) -> tuple:
+    # (watermark, campos de data presentes na coleção) ou (None, ()) se nunca sincronizada
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT watermark, campos FROM watermarks WHERE env=? AND colecao=? AND account=?",
+            (env, colecao(url, fields), account),
+        ).fetchone()
+    if row is None:
+        return None, ()
+    return row[0], tuple(json.loads(row[1]))
+
+
+def load(env: str, url: str, account: str, fields=None) -> pd.DataFrame:
+    tabela = _tabela(colecao(url, fields))
+    with _connect() as conn:
+        if not _existe(conn, tabela):
+            return pd.DataFrame()
+        cursor = conn.execute(
+            f"SELECT * FROM {_quote(tabela)} WHERE _env=? AND _account=? ORDER BY id", (env, account)
+        )
+        colunas = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame.from_records(rows, columns=colunas).drop(columns=["_env", "_account"])
+
+
+def upsert(env: str, url: str, account: str, df: pd.DataFrame, fields=None):
+    # Grava/atualiza as linhas por `id` e avança o watermark para a maior data vista
+    if df.empty or "id" not in df.columns:
+        return
+    campos = [c for c in WATERMARK_FIELDS if c in df.columns]
+    watermark = max((df[c].dropna().astype(str).max() for c in campos if df[c].notna().any()), default=None)
+    colunas = [str(c) for c in df.columns]
+    nome = colecao(url, fields)
+    tabela = _tabela(nome)
+    sql = (f"INSERT OR REPLACE INTO {_quote(tabela)} (_env, _account, {', '.join(map(_quote, colunas))}) "
+           f"VALUES (?, ?, {', '.join('?' * len(colunas))})")
+    with _write_lock, _connect() as conn:
+        _prepara(conn, tabela, colunas)
+        conn.executemany(
+            sql, ((env, account, *map(_valor, linha)) for linha in df.astype(object).itertuples(index=False, name=None))
+        )
+        if watermark is not None:
+            antigo = conn.execute(
+                "SELECT watermark, campos FROM watermarks WHERE env=? AND colecao=? AND account=?",
+                (env, nome, account),
+            ).fetchone()
+            # Também regrava quando aparece um campo de data novo (ex.: date_updated
+            # passou a vir na projeção), para o próximo sync filtrar por ele
+            if antigo is None or watermark > antigo[0] or set(campos) - set(json.loads(antigo[1])):
+                conn.execute(
+                    "INSERT OR REPLACE INTO watermarks (env, colecao, account, watermark, campos) VALUES (?, ?, ?, ?, ?)",
+                    (env, nome, account, max(watermark, antigo[0]) if antigo else watermark, json.dumps(campos)),
+                )
+
+
+def since_params(watermark: str, campos: tuple) -> dict:
+    # Linhas criadas ou alteradas depois do watermark
+    if len(campos) == 1:
+        return {f"filter[{campos[0]}][_gt]": watermark}
+    return {f"filter[_or][{i}][{campo}][_gt]": watermark for i, campo in enumerate(campos)}
+
+
+def synced_at(env: str, url: str, account: str, fields=None) -> float | None:
+    # Horário (time.time) da última sincronização bem-sucedida, ou None
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT synced_at FROM sincronizacoes WHERE env=? AND colecao=? AND account=?",
+            (env, colecao(url, fields), account),
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _marca_sincronizado(env: str, url: str, account: str, fields=None):
+    with _write_lock, _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO sincronizacoes (env, colecao, account, synced_at) VALUES (?, ?, ?, ?)",
+            (env, colecao(url, fields), account, time.time()),
+        )
+
+
+def _substitui(env: str, url: str, account: str, df: pd.DataFrame, fields=None):
+    # Coleções sem histórico (coreops_accounts): a cópia local é trocada inteira
+    tabela = _tabela(colecao(url, fields))
+    with _write_lock, _connect() as conn:
+        if _existe(conn, tabela):
+            conn.execute(f"DELETE FROM {_quote(tabela)} WHERE _env=? AND _account=?", (env, account))
+    upsert(env, url, account, df, fields)
+
+
+def sync(env: str, url: str, bearer: str, account: str, timeout=directus.DEFAULT_TIMEOUT,
+         on_progress=None, fields=None, periodo=None, max_age: float | None = None) -> pd.DataFrame:
+    """Traz só o que mudou desde o último watermark, faz upsert por `id` e
+    devolve a coleção completa a partir do banco local.
+
+    Coleções sem paginação (coreops_accounts) são buscadas inteiras e substituídas.
+    Com `max_age` (segundos), se a última sincronização (ex.: do warmer.py) for mais
+    recente que isso, lê só do banco local, sem ir à rede.
+    Exclusões feitas no Directus não são detectadas: use `clear` para ressincronizar.
+    O banco guarda o histórico inteiro; `periodo` é aplicado na leitura local.
+    """
+    if max_age is not None:
+        ultima = synced_at(env, url, account, fields)
+        if ultima is not None and time.time() - ultima <= max_age:
+            return no_periodo(load(env, url, account, fields), url, periodo)
+
+    if directus.build_params(url, account).get("limit") != -1:
+        df = directus.fetch(url, bearer, account, timeout, on_progress=on_progress, fields=fields)
+        _substitui(env, url, account, df, fields)
+        _marca_sincronizado(env, url, account, fields)
+        return no_periodo(df, url, periodo)
+
+    watermark, campos = get_watermark(env, url, account, fields)
+    extra = since_params(watermark, campos) if watermark is not None else None
+    novos = directus.fetch(url, bearer, account, timeout, on_progress=on_progress, extra_params=extra,
+                           fields=fields)
+    upsert(env, url, account, novos, fields)
+    if watermark is None and "id" not in novos.columns:
+        # Sem `id` não há como fazer upsert; devolve o que veio
+        return no_periodo(novos, url, periodo)
+    _marca_sincronizado(env, url, account, fields)
+    return no_periodo(load(env, url, account, fields), url, periodo)
+
+
+def no_periodo(df: pd.DataFrame, url: str, periodo) -> pd.DataFrame:
+    # Mesmo recorte que o filtro _between do Directus, feito sobre as linhas locais
+    campo = directus.time_field(url)
+    if not periodo or campo not in df.columns:
+        return df
+    datas = pd.to_datetime(df[campo], errors="coerce", utc=True)
+    inicio, fim = (pd.to_datetime(p, utc=True) for p in periodo)
+    return df[datas.between(inicio, fim)].reset_index(drop=True)
+
+
+def fetcher(env: str, max_age: float | None = None):
+    # Adaptador com a assinatura de directus.fetch, para directus.fetch_all(fetcher=...)
+    return functools.partial(sync, env, max_age=max_age)
+
+
+def clear(env: str | None = None, account: str | None = None):
+    with _write_lock, _connect() as conn:
+        tabelas = [nome for (nome,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'linhas\\_%' ESCAPE '\\'")]
+        for tabela in tabelas:
+            conn.execute(
+                f"DELETE FROM {_quote(tabela)} WHERE (? IS NULL OR _env=?) AND (? IS NULL OR _account=?)",
+                (env, env, account, account),
+            )
+        for tabela in ("watermarks", "sincronizacoes"):
+            conn.execute(
+                f"DELETE FROM {tabela} WHERE (? IS NULL OR env=?) AND (? IS NULL OR account=?)",
+                (env, env, account, account),
+            )
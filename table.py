@@ -0,0 +1,55 @@
+"""Paginação da tabela bruta no servidor do Streamlit.
+
+Só a página visível vai para o navegador. A ordem de cada coluna (e a máscara
+de cada filtro) é calculada uma vez por dataset e fica no cache, indexada pelo
+fingerprint do frame; trocar de página é só um fatiamento de posições.
+"""
+import numpy as np
+import pandas as pd
+
+import analytics
+import cache
+
+PAGE_SIZES = (25, 50, 100, 500)
+
+
+def sort_order(df: pd.DataFrame, column: str | None, ascending: bool = True) -> np.ndarray:
+    # Posições das linhas na ordem pedida; None = ordem original. Nulos vão para o fim.
+    if column is None:
+        return np.arange(len(df))
+
+    def _ordena():
+        serie = df[column].reset_index(drop=True)
+        try:
+            ordenada = serie.sort_values(ascending=ascending, kind="stable", na_position="last")
+        except TypeError:
+            # Coluna com tipos misturados (ex.: JSON do Directus): ordena pelo texto
+            ordenada = serie.astype(str).sort_values(ascending=ascending, kind="stable")
+        return ordenada.index.to_numpy()
+    return cache.get_or_load(("sort_order", analytics.fingerprint(df), column, ascending), _ordena)
+
+
+def filter_mask(df: pd.DataFrame, column: str, texto: str) -> np.ndarray:
+    # Linhas cujo valor (como texto) contém `texto`, sem diferenciar maiúsculas
+    def _filtra():
+        return df[column].astype(str).str.contains(texto, case=False, regex=False).to_numpy()
+    return cache.get_or_load(("filter_mask", analytics.fingerprint(df), column, texto), _filtra)
+
+
+def visible_rows(df: pd.DataFrame, sort_by: str | None = None, ascending: bool = True,
+                 filter_by: str | None = None, texto: str = "") -> np.ndarray:
+    """Posições das linhas visíveis (filtradas) já na ordem de exibição."""
+    ordem = sort_order(df, sort_by, ascending)
+    if filter_by and texto:
+        ordem = ordem[filter_mask(df, filter_by, texto)[ordem]]
+    return ordem
+
+
+def page(df: pd.DataFrame, ordem: np.ndarray, numero: int, tamanho: int) -> pd.DataFrame:
+    # Página `numero` (começando em 1) de `tamanho` linhas
+    inicio = (numero - 1) * tamanho
+    return df.iloc[ordem[inicio:inicio + tamanho]]
+
+
+def page_count(total: int, tamanho: int) -> int:
+    return max(1, -(-total // tamanho))
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+import pytest
+
+import cache
+import directus
+import metrics
+from bench import fake_directus, synthetic
+
+
+class _Rerun(BaseException):
+    # Como o RerunException do Streamlit: não herda de Exception
+    pass
+
+
+@pytest.fixture
+def urls(monkeypatch):
+    monkeypatch.setattr(metrics, "LOG_PATH", os.devnull)
+    cache.frames.clear()
+    srv = fake_directus.serve(synthetic.make_dataset({"A": 100}))
+    chamadas = []
+    fetch = directus.fetch
+
+    def _lento(url, *args, **kwargs):
+        # Uma chamada lenta, para a segunda sessão chegar com a carga em andamento
+        chamadas.append(url)
+        time.sleep(0.6)
+        return fetch(url, *args, **kwargs)
+
+    monkeypatch.setattr(directus, "fetch", _lento)
+    yield {"Balance": f"{srv.base_url}/log_balance"}, chamadas
+    srv.shutdown()
+    cache.frames.clear()
+
+
+def test_sessoes_simultaneas_dividem_uma_carga(urls):
+    urls, chamadas = urls
+    resultados = []
+    sessoes = [threading.Thread(target=lambda: resultados.append(cache.fetch_all("test", urls, "x", "A")))
+               for _ in range(4)]
+    for t in sessoes:
+        t.start()
+    for t in sessoes:
+        t.join()
+    assert len(chamadas) == 1
+    assert all(frames["Balance"] is resultados[0][0]["Balance"] for frames, _ in resultados)
+
+
+def test_rerun_de_uma_sessao_nao_chega_nas_outras(urls):
+    urls, chamadas = urls
+
+    def _interrompe(progresso):
+        raise _Rerun()
+
+    primeira = {}
+
+    def _sessao_interrompida():
+        try:
+            cache.fetch_all("test", urls, "x", "A", on_progress=_interrompe)
+        except _Rerun:
+            primeira["rerun"] = True
+
+    t = threading.Thread(target=_sessao_interrompida)
+    t.start()
+    time.sleep(0.1)
+    frames, erros = cache.fetch_all("test", urls, "x", "A")
+    t.join()
+
+    assert primeira == {"rerun": True}
+    assert erros == {}
+    assert len(frames["Balance"]) == 10
+    assert len(chamadas) == 1
+    # A carga terminou mesmo com o rerun e ficou no cache
+    assert cache.frames.get(cache.query_key("test", urls["Balance"], "A")) is frames["Balance"]
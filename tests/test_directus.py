@@ -0,0 +1,46 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import directus
+import metrics
+from bench import fake_directus, synthetic
+
+
+class _PaginaHtml(BaseHTTPRequestHandler):
+    # Proxy/gateway devolvendo uma página de erro com status 200
+    def do_GET(self):
+        corpo = b"<html><body>Bad gateway</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _sem_log(monkeypatch):
+    monkeypatch.setattr(metrics, "LOG_PATH", os.devnull)
+
+
+def test_corpo_invalido_vira_erro_da_colecao():
+    html = ThreadingHTTPServer(("127.0.0.1", 0), _PaginaHtml)
+    threading.Thread(target=html.serve_forever, daemon=True).start()
+    srv = fake_directus.serve(synthetic.make_dataset({"A": 10}))
+    try:
+        urls = {
+            "Balance": f"{srv.base_url}/log_balance",
+            "PnL": f"http://127.0.0.1:{html.server_address[1]}/items/Log__Pnl",
+        }
+        frames, erros = directus.fetch_all(urls, "x", "A")
+    finally:
+        srv.shutdown()
+        html.shutdown()
+    assert list(erros) == ["PnL"]
+    assert frames["PnL"].empty
+    assert len(frames["Balance"]) == 1
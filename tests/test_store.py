@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+import config
+import metrics
+import store
+from bench import fake_directus, synthetic
+
+ACCOUNT = "A"
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "STORE_PATH", str(tmp_path / "store.sqlite"))
+    monkeypatch.setattr(metrics, "LOG_PATH", os.devnull)
+    dataset = synthetic.make_dataset({ACCOUNT: 50})
+    srv = fake_directus.serve(dataset)
+    yield srv, dataset
+    srv.shutdown()
+
+
+def test_sync_com_projecao_ve_linha_editada(servidor):
+    # Edição no lugar (date_updated novo) precisa chegar mesmo com a projeção de config.CAMPOS
+    srv, dataset = servidor
+    url = f"{srv.base_url}/Log__Trading_history"
+    campos = config.CAMPOS["Trading History"]
+
+    antes = store.sync("test", url, "x", ACCOUNT, fields=campos)
+    assert "date_updated" in antes.columns
+
+    trading = dataset["Log__Trading_history"]
+    trading.loc[trading["id"] == 1, "Closeprice"] = 123.0
+    trading.loc[trading["id"] == 1, "date_updated"] = "2030-01-01T00:00:00.000Z"
+
+    depois = store.sync("test", url, "x", ACCOUNT, fields=campos)
+    assert len(depois) == len(antes)
+    assert float(depois.loc[depois["id"] == 1, "Closeprice"].iloc[0]) == 123.0
+
+
+def test_load_ordena_por_id_numerico_e_mantem_tipos(tmp_path, monkeypatch):
+    # id guardado como número: 10 vem depois de 9 (a aba Estatística usa iloc[0])
+    monkeypatch.setattr(store, "STORE_PATH", str(tmp_path / "store.sqlite"))
+    url = "http://directus/items/log_estatistica"
+    df = synthetic.make_dataset({ACCOUNT: 50})["Log__Trading_history"].head(12)
+    store.upsert("test", url, ACCOUNT, df.iloc[::-1])
+
+    lido = store.load("test", url, ACCOUNT)
+    assert lido["id"].tolist() == sorted(df["id"].tolist())
+    assert lido.dtypes.to_dict() == df.dtypes.to_dict()
@@ -0,0 +1,79 @@
+"""Séries temporais de saldo e drawdown em várias resoluções.
+
+Os snapshots de log__drawdown_tracking (e o saldo de log_balance, juntado por
+as-of) são agregados por minuto, hora e dia. O gráfico usa a resolução mais
+fina que ainda cabe em `charts.MAX_POINTS` pontos na janela escolhida, em vez
+de processar todas as linhas brutas a cada rerun.
+"""
+import pandas as pd
+
+import analytics
+import cache
+import charts
+
+# Da mais fina para a mais grossa
+RESOLUTIONS = {"minuto": "1min", "hora": "1h", "dia": "1D"}
+
+# Como cada coluna é agregada no intervalo. Todas são combináveis, então a
+# hora sai do minuto e o dia da hora. Saldo flutuante e drawdown guardam o pior
+# valor do intervalo para não esconder vales; topos (HWM) guardam o máximo.
+AGG = {
+    "balance": "last",
+    "saldo_atual": "last",
+    "saldo_flt": "min",
+    "hwm": "max",
+    "dd_max": "max",
+    "hwm_balance": "max",
+    "drawdown_balance": "min",
+}
+
+
+def high_water_mark(balance: pd.DataFrame) -> pd.DataFrame:
+    """HWM e drawdown recalculados do saldo (máximo acumulado)."""
+    out = balance[["date_created", "balance"]].dropna().sort_values("date_created", kind="stable")
+    out["hwm_balance"] = out["balance"].cummax()
+    out["drawdown_balance"] = out["balance"] - out["hwm_balance"]
+    return out.reset_index(drop=True)
+
+
+def with_balance(draw: pd.DataFrame, balance: pd.DataFrame) -> pd.DataFrame:
+    # Cada snapshot de drawdown recebe o último saldo conhecido até ele (merge_asof)
+    colunas = ["date_created"] + [c for c in AGG if c in draw.columns]
+    draw = draw[colunas].dropna(subset=["date_created"])
+    if balance.empty or not {"date_created", "balance"}.issubset(balance.columns):
+        return draw.reset_index(drop=True)
+    saldo = high_water_mark(balance)
+    return pd.merge_asof(draw.sort_values("date_created", kind="stable"), saldo,
+                         on="date_created", direction="backward")
+
+
+def rollups(df: pd.DataFrame) -> dict:
+    """{resolução: frame agregado} de um frame ordenado por `date_created`."""
+    spec = {c: f for c, f in AGG.items() if c in df.columns}
+    result = {}
+    base = df
+    for nome, freq in RESOLUTIONS.items():
+        base = base.resample(freq, on="date_created").agg(spec).dropna(how="all").reset_index()
+        result[nome] = base
+    return result
+
+
+def drawdown_series(draw: pd.DataFrame, balance: pd.DataFrame) -> tuple:
+    # (frame bruto com saldo, rollups), memoizados pelo fingerprint das duas coleções
+    def _monta():
+        bruto = with_balance(draw, balance)
+        return {"bruto": bruto, **rollups(bruto)}
+    niveis = cache.get_or_load(("drawdown_series", analytics.fingerprint(draw), analytics.fingerprint(balance)),
+                               _monta)
+    return niveis["bruto"], {nome: niveis[nome] for nome in RESOLUTIONS}
+
+
+def pick_resolution(bruto: pd.DataFrame, niveis: dict, inicio, fim, max_points: int = charts.MAX_POINTS) -> tuple:
+    """(nome, frame recortado em [inicio, fim]) na resolução mais fina que cabe em `max_points`."""
+    candidatos = [("bruto", bruto)] + list(niveis.items())
+    for nome, frame in candidatos:
+        datas = frame["date_created"]
+        # Busca binária: os frames estão ordenados por data
+        ini, fim_idx = datas.searchsorted(inicio, side="left"), datas.searchsorted(fim, side="right")
+        if fim_idx - ini <= max_points or nome == candidatos[-1][0]:
+            return nome, frame.iloc[ini:fim_idx]
@@ -0,0 +1,168 @@
+"""Aquece o banco local (store.py) com as contas da watchlist, fora do Streamlit.
+
+Roda como processo separado e, a cada `--interval` segundos, sincroniza as
+coleções de cada conta da watchlist (as mesmas projeções do dashboard,
+config.CAMPOS) com concorrência e taxa de requisições limitadas. O dashboard
+lê essas contas do banco local sem ir à rede enquanto a última sincronização
+for mais recente que duas vezes o intervalo (ver `fresh_accounts`).
+
+A watchlist junta um arquivo local (uma conta por linha) e as contas de
+coreops_accounts com status em `--status`:
+
+    python -m warmer --env blueberry --accounts-file contas.txt --status active
+    python -m warmer --env p4f --status active --interval 120 --workers 4 --rate 5 --once
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import config
+import directus
+import metrics
+import store
+
+STATE_PATH = os.getenv("WARMER_STATE", ".store/warmer.json")
+
+
+class RateLimiter:
+    """Token bucket: no máximo `rate` chamadas por segundo, somando todas as threads."""
+
+    def __init__(self, rate: float):
+        self.intervalo = 1 / rate if rate > 0 else 0
+        self._proxima = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proxima - agora
+            self._proxima = max(agora, self._proxima) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+def accounts_from_file(caminho: str) -> list:
+    with open(caminho, encoding="utf-8") as f:
+        return [linha.strip() for linha in f if linha.strip() and not linha.startswith("#")]
+
+
+def accounts_from_coreops(cfg: config.EnvConfig, status: list | None, timeout=directus.DEFAULT_TIMEOUT) -> list:
+    # Contas marcadas em coreops_accounts (ex.: status=active); status=None = todas
+    campo = directus.account_field(cfg.coreops_accounts)
+    params = {"fields": campo, "limit": -1}
+    if status is not None:
+        params["filter[status][_in]"] = ",".join(status)
+    df, _ = directus.get_frame(cfg.coreops_accounts, cfg.bearer, params, timeout)
+    return [] if df.empty else df[campo].dropna().astype(str).unique().tolist()
+
+
+def watchlist(cfg: config.EnvConfig, accounts_file: str | None = None, status: list | None = None) -> list:
+    contas = []
+    if accounts_file:
+        contas += accounts_from_file(accounts_file)
+    if status:
+        contas += accounts_from_coreops(cfg, status)
+    return list(dict.fromkeys(contas))
+
+
+def refresh(cfg: config.EnvConfig, contas: list, workers: int = 4, limiter: RateLimiter | None = None) -> dict:
+    """Sincroniza todas as coleções de `contas`; devolve {conta: [erros]}."""
+    urls = {**cfg.urls, "coreops_accounts": cfg.coreops_accounts}
+    erros = {conta: [] for conta in contas}
+
+    def _sync(conta, nome, url):
+        if limiter is not None:
+            limiter.acquire()
+        with metrics.timer("warmer", env=cfg.name, account=conta, colecao=directus.collection_name(url)):
+            store.sync(cfg.name, url, cfg.bearer, conta, fields=config.CAMPOS.get(nome))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmer") as pool:
+        futuros = {pool.submit(_sync, conta, nome, url): (conta, nome)
+                   for conta in contas for nome, url in urls.items() if url}
+    for futuro, (conta, nome) in futuros.items():
+        # Qualquer falha (rede, SQLite, decode...) tira a conta da lista de aquecidas
+        try:
+            futuro.result()
+        except Exception as e:
+            erros[conta].append(f"{nome}: {e}")
+    return erros
+
+
+def _write_state(env: str, contas: list, interval: float):
+    # O dashboard lê este arquivo para saber quais contas estão aquecidas
+    estado = read_state()
+    estado[env] = {"accounts": contas, "interval": interval, "updated": time.time()}
+    os.makedirs(os.path.dirname(STATE_PATH) or ".", exist_ok=True)
+    temporario = f"{STATE_PATH}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    os.replace(temporario, STATE_PATH)
+
+
+def read_state() -> dict:
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def fresh_accounts(env: str) -> tuple:
+    """(contas aquecidas de `env`, idade máxima aceitável em segundos) segundo o estado do warmer."""
+    estado = read_state().get(env)
+    if not estado:
+        return frozenset(), None
+    max_age = 2 * estado["interval"]
+    if time.time() - estado["updated"] > max_age:
+        # Warmer parado: não confiar mais na cópia local
+        return frozenset(), None
+    return frozenset(estado["accounts"]), max_age
+
+
+def run(env: str, accounts_file: str | None, status: list | None, interval: float, workers: int,
+        rate: float, once: bool = False):
+    cfg = config.get(env)
+    limiter = RateLimiter(rate)
+    while True:
+        inicio = time.monotonic()
+        try:
+            contas = watchlist(cfg, accounts_file, status)
+        except requests.RequestException as e:
+            print(f"[{env}] erro ao ler a watchlist: {e}", flush=True)
+            contas = read_state().get(env, {}).get("accounts", [])
+        erros = refresh(cfg, contas, workers, limiter)
+        _write_state(env, [c for c in contas if not erros[c]], interval)
+        falhas = {c: e for c, e in erros.items() if e}
+        print(f"[{env}] {len(contas) - len(falhas)}/{len(contas)} contas em "
+              f"{time.monotonic() - inicio:.1f}s", flush=True)
+        for conta, mensagens in falhas.items():
+            print(f"  {conta}: {'; '.join(mensagens)}", flush=True)
+        if once:
+            return
+        time.sleep(max(0.0, interval - (time.monotonic() - inicio)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--env", choices=config.ENVS, required=True)
+    parser.add_argument("--accounts-file", help="arquivo com uma conta por linha")
+    parser.add_argument("--status", nargs="*", default=None,
+                        help="status de coreops_accounts que entram na watchlist (ex.: active)")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("WARMER_INTERVAL", "300")),
+                        help="segundos entre atualizações")
+    parser.add_argument("--workers", type=int, default=4, help="sincronizações simultâneas")
+    parser.add_argument("--rate", type=float, default=10, help="máximo de sincronizações iniciadas por segundo")
+    parser.add_argument("--once", action="store_true", help="uma rodada e sai")
+    args = parser.parse_args()
+    if not args.accounts_file and not args.status:
+        parser.error("informe --accounts-file e/ou --status")
+    run(args.env, args.accounts_file, args.status, args.interval, args.workers, args.rate, args.once)
+
+
+if __name__ == "__main__":
+    main()